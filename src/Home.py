@@ -1,5 +1,6 @@
 # Home.py
 import streamlit as st
+from datetime import datetime, timedelta, timezone
 from db.schema import init_db #, migrate_existing_data
 
 import sys
@@ -13,6 +14,17 @@ st.set_page_config(
     layout="wide"
 )
 
+# Provider usage shown on the home page covers this many recent days
+USAGE_WINDOW_DAYS = 30
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def project_usage(project, group_by, since):
+    """Usage rollup for a project, cached so reruns do not query t_usage every time"""
+    from utils.metering import get_default_meter
+    return get_default_meter().rollup(group_by=group_by, since=since, project=project)
+
+
 def main():
     st.title("Translation Management System")
     
@@ -69,6 +81,20 @@ def main():
         with col3:
             st.metric("Pending", len(translations) - completed)
 
+        # Provider usage accounted to this project over the recent window
+        since = (datetime.now(timezone.utc) - timedelta(days=USAGE_WINDOW_DAYS)).strftime('%Y-%m-%d')
+        usage = project_usage(st.session_state.current_project, (), since)[0]
+        st.caption(f"Provider usage over the last {USAGE_WINDOW_DAYS} days")
+        col4, col5, col6 = st.columns(3)
+        with col4:
+            st.metric("Characters Billed", f"{usage['billed_characters'] or 0:,}")
+        with col5:
+            st.metric("Characters From Cache", f"{usage['cached_characters'] or 0:,}")
+        with col6:
+            st.metric("Provider Requests", f"{usage['requests'] or 0:,}")
+        with st.expander("Usage by day and provider"):
+            st.dataframe(project_usage(st.session_state.current_project, ("day", "provider"), since))
+
 if __name__ == "__main__":
     # Initialize database with new schema
     init_db()
@@ -0,0 +1,87 @@
+# db/connection.py
+import sqlite3
+import threading
+from contextlib import contextmanager
+from db import DB_PATH
+
+# Applied to every connection when it is opened
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",          # readers no longer block the writer (persists in the file)
+    "PRAGMA busy_timeout=5000",         # wait up to 5 s for a lock instead of failing
+    "PRAGMA synchronous=NORMAL",        # fsync at checkpoints only; safe with WAL
+    "PRAGMA cache_size=-16000",         # 16 MB page cache per connection
+    "PRAGMA mmap_size=268435456",       # read through a 256 MB memory map
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Prepared statements kept per connection; the app uses a few dozen distinct SQL strings
+STATEMENT_CACHE_SIZE = 256
+
+# Idle connections kept per database file. More can be open while many threads
+# use the database at once; connections beyond this are closed when returned
+POOL_SIZE = 4
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _connect(db_path):
+    # Pooled connections move between threads, but only one thread uses a connection at a time
+    conn = sqlite3.connect(db_path, timeout=5.0, cached_statements=STATEMENT_CACHE_SIZE,
+                           check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+@contextmanager
+def pooled_connection(db_path=None):
+    """
+    Borrow a long-lived connection from the process-wide pool.
+    Streamlit runs every rerun in a new thread, so connections are pooled
+    per process rather than per thread: each operation reuses an idle
+    connection (and its prepared statements) instead of reconnecting, and
+    hands it back when the block exits.
+    """
+    db_path = db_path or DB_PATH
+    with _pools_lock:
+        idle = _pools.get(db_path)
+        conn = idle.pop() if idle else None
+    if conn is None:
+        conn = _connect(db_path)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        with _pools_lock:
+            idle = _pools.setdefault(db_path, [])
+            if len(idle) < POOL_SIZE:
+                idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+
+
+def close_connections():
+    """Close every idle pooled connection (e.g. before deleting the database file)"""
+    with _pools_lock:
+        connections = [conn for idle in _pools.values() for conn in idle]
+        _pools.clear()
+    for conn in connections:
+        conn.close()
+
+
+@contextmanager
+def immediate_transaction(conn):
+    """
+    Explicit write transaction that takes the write lock up front
+    (BEGIN IMMEDIATE), so no other writer can interleave before COMMIT.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
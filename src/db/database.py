@@ -1,72 +1,298 @@
 # db/database.py
-import sqlite3
+import re
 from datetime import datetime
+from itertools import islice
 from db import DB_PATH
+from db.connection import immediate_transaction, pooled_connection
+from db.schema import search_tokenizer
+
+# Rows written per transaction by the bulk APIs; one commit (one fsync) per chunk
+BULK_CHUNK_SIZE = 5000
+
+# Keys accepted in dict rows, in save_translation argument order
+_SAVE_FIELDS = ("project", "source_text", "target_text", "source_lang", "target_lang", "provider", "note")
+_UPDATE_FIELDS = ("id", "target_text", "note")
+
+# Columns covered by the full-text search index, in index order
+SEARCH_COLUMNS = ("source_text", "target_text", "note")
+
+# The trigram tokenizer cannot match terms shorter than this
+TRIGRAM_MIN_CHARS = 3
+
+# Statements shared by several methods, and checked by db.schema.check_query_plans()
+UPDATE_QUERY = '''
+    UPDATE t_translations
+    SET target_text = ?, note = ?, updated_by = ?, updated_at = ?
+    WHERE id = ?
+'''
+PROJECTS_QUERY = 'SELECT DISTINCT project FROM t_translations ORDER BY project'
+
+_RESULT_FIELDS = ("id", "project", "provider", "source_text", "target_text", "source_lang",
+                  "target_lang", "note", "created_at", "updated_at")
+
+
+def _chunks(rows, size):
+    """Consume an iterable size items at a time without materializing it"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _fts_phrase(term):
+    """A user term as an FTS5 string literal, so operators and quotes in it match literally"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like_pattern(term):
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _mark(text, terms, marks):
+    """Wrap case-insensitive occurrences of terms in marks (highlight() for unindexed terms)"""
+    if not text or not terms:
+        return text
+    pattern = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return re.sub(pattern, lambda match: f"{marks[0]}{match.group(0)}{marks[1]}", text, flags=re.IGNORECASE)
+
+
+def translation_cursor(row):
+    """Pagination cursor (created_at, id) of a t_translations row from get_translations"""
+    return row[10], row[0]
+
+
+def _translation_filters(project, source_lang, target_lang, provider, completed, table=""):
+    """WHERE conditions and parameters shared by listing and search"""
+    conditions, params = [], []
+    for column, value in (("project", project), ("source_lang", source_lang),
+                          ("target_lang", target_lang), ("service_provider", provider)):
+        if value:
+            conditions.append(f"{table}{column} = ?")
+            params.append(value)
+    if completed is not None:
+        # IS NULL exactly as in the partial idx_translations_pending index
+        conditions.append(f"{table}target_text IS NOT NULL" if completed else f"{table}target_text IS NULL")
+    return conditions, params
+
+
+def _values(row, fields):
+    """Row as a tuple in fields order; dict rows are looked up by key"""
+    if isinstance(row, dict):
+        return tuple(row.get(field) for field in fields)
+    return tuple(row)
+
+
+def translations_query(project=None, limit=100, after=None, before=None, source_lang=None,
+                       target_lang=None, provider=None, completed=None):
+    """SQL and parameters of a TranslationDB.get_translations() page"""
+    conditions, params = _translation_filters(project, source_lang, target_lang, provider, completed)
+    order = "DESC"
+    if after is not None:
+        conditions.append("(created_at, id) < (?, ?)")
+        params.extend(after)
+    elif before is not None:
+        conditions.append("(created_at, id) > (?, ?)")
+        params.extend(before)
+        order = "ASC"
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f'''
+        SELECT * FROM t_translations
+        {where}
+        ORDER BY created_at {order}, id {order} LIMIT ?
+    '''
+    return sql, (*params, limit)
+
+
+def search_query(query, tokenizer, project=None, columns=SEARCH_COLUMNS, source_lang=None, target_lang=None,
+                 provider=None, completed=None, page=1, page_size=20, marks=("[", "]")):
+    """
+    SQL and parameters of a TranslationDB.search() page (one row more than
+    page_size, to tell whether there is a next page), and the terms the
+    index cannot match, which are highlighted in Python.
+    """
+    terms = query.split()
+    columns = [column for column in SEARCH_COLUMNS if column in columns]
+    if tokenizer == "trigram":
+        indexed = [term for term in terms if len(term) >= TRIGRAM_MIN_CHARS]
+    else:
+        indexed = terms
+    unindexed = [term for term in terms if term not in indexed]
+
+    conditions, params = _translation_filters(project, source_lang, target_lang, provider, completed, table="t.")
+    for term in unindexed:
+        # Short CJK words are below the trigram size and are matched directly
+        conditions.append("(" + " OR ".join(f"t.{column} LIKE ? ESCAPE '\\'" for column in columns) + ")")
+        params.extend([_like_pattern(term)] * len(columns))
+    where = "".join(f" AND {condition}" for condition in conditions)
+    selected = ", ".join(f"t.{field}" if field != "provider" else "t.service_provider" for field in _RESULT_FIELDS)
+    offset = (max(page, 1) - 1) * page_size
+
+    if indexed:
+        match = "{" + " ".join(columns) + "} : (" + " ".join(_fts_phrase(term) for term in indexed) + ")"
+        highlights = ", ".join(
+            f"highlight(t_translations_fts, {index}, ?, ?)" for index in range(len(SEARCH_COLUMNS))
+        )
+        sql = f'''
+            SELECT {selected}, {highlights}, t_translations_fts.rank
+            FROM t_translations_fts
+            JOIN t_translations t ON t.id = t_translations_fts.rowid
+            WHERE t_translations_fts MATCH ?{where}
+            ORDER BY t_translations_fts.rank LIMIT ? OFFSET ?
+        '''
+        args = [*marks * len(SEARCH_COLUMNS), match, *params, page_size + 1, offset]
+    else:
+        # Only short terms: a LIKE scan, newest first, narrowed by the filters and stopped at the LIMIT
+        sql = f'''
+            SELECT {selected}, t.source_text, t.target_text, t.note, NULL
+            FROM t_translations t
+            WHERE 1{where}
+            ORDER BY t.created_at DESC, t.id DESC LIMIT ? OFFSET ?
+        '''
+        args = [*params, page_size + 1, offset]
+    return sql, args, unindexed
+
 
 class TranslationDB:
     def __init__(self, db_path=None):
         self.db_path = db_path or DB_PATH
+        self._tokenizer = None
 
-    def save_translation(self, project, source_text, target_text, source_lang, 
+    def _conn(self):
+        """A connection borrowed from the process-wide pool for one operation (see db.connection)"""
+        return pooled_connection(self.db_path)
+
+    def save_translation(self, project, source_text, target_text, source_lang,
                         target_lang, provider, note, user=None):
         """Save translation to database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''
-            INSERT INTO t_translations 
-            (project, service_provider, source_text, target_text, source_lang, 
-             target_lang, note, created_by, updated_by)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (project, provider, source_text, target_text, source_lang, 
-              target_lang, note, user, user))
-        
-        conn.commit()
-        conn.close()
-
-    def get_translations(self, project=None, limit=100):
-        """Get translations with optional project filter"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        if project:
-            c.execute('''
-                SELECT * FROM t_translations 
-                WHERE project = ? 
-                ORDER BY created_at DESC LIMIT ?
-            ''', (project, limit))
-        else:
-            c.execute('''
-                SELECT * FROM t_translations 
-                ORDER BY created_at DESC LIMIT ?
-            ''', (limit,))
-        
-        rows = c.fetchall()
-        conn.close()
-        return rows
+        with self._conn() as conn, conn:
+            conn.execute('''
+                INSERT INTO t_translations
+                (project, service_provider, source_text, target_text, source_lang,
+                 target_lang, note, created_by, updated_by)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (project, provider, source_text, target_text, source_lang,
+                  target_lang, note, user, user))
+
+    def save_translations_many(self, rows, user=None, chunk_size=BULK_CHUNK_SIZE):
+        """
+        Insert many translations, chunk_size rows per transaction.
+        rows is any iterable (a generator is consumed lazily) of
+        (project, source_text, target_text, source_lang, target_lang, provider, note)
+        tuples or dicts with those keys. Returns the inserted ids as a list
+        of inclusive (first_id, last_id) ranges.
+        """
+        ranges = []
+        for chunk in _chunks(rows, chunk_size):
+            params = [
+                (project, provider, source_text, target_text, source_lang, target_lang, note, user, user)
+                for project, source_text, target_text, source_lang, target_lang, provider, note
+                in (_values(row, _SAVE_FIELDS) for row in chunk)
+            ]
+            # The connection goes back to the pool between chunks, while rows is consumed
+            with self._conn() as conn, immediate_transaction(conn):
+                conn.executemany('''
+                    INSERT INTO t_translations
+                    (project, service_provider, source_text, target_text, source_lang,
+                     target_lang, note, created_by, updated_by)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', params)
+                # The write lock is held for the whole chunk, so its ids are consecutive
+                last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            first_id = last_id - len(params) + 1
+            if ranges and ranges[-1][1] + 1 == first_id:
+                ranges[-1] = (ranges[-1][0], last_id)
+            else:
+                ranges.append((first_id, last_id))
+        return ranges
+
+    def get_translations(self, project=None, limit=100, after=None, before=None, source_lang=None,
+                         target_lang=None, provider=None, completed=None):
+        """
+        Get a page of translations, newest first, with optional filters.
+        Pages are keyed on (created_at, id): pass the translation_cursor() of
+        the last row as after for the next (older) page, or of the first row
+        as before for the previous (newer) page. Each page is an index range
+        read, so it costs the same however deep it is.
+        completed is True for translated rows, False for pending ones.
+        """
+        sql, params = translations_query(project, limit, after, before, source_lang, target_lang, provider, completed)
+        with self._conn() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        # Previous pages are read oldest first from the cursor; return them newest first too
+        return rows[::-1] if before is not None and after is None else rows
+
+    def iter_translations(self, page_size=1000, **filters):
+        """
+        Every translation matching the get_translations filters, newest first,
+        read page_size rows at a time so memory stays flat on any table size.
+        """
+        after = None
+        while True:
+            rows = self.get_translations(limit=page_size, after=after, **filters)
+            yield from rows
+            if len(rows) < page_size:
+                return
+            after = translation_cursor(rows[-1])
 
     def update_translation(self, id, target_text, note, user=None):
         """Update existing translation"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        c.execute('''
-            UPDATE t_translations 
-            SET target_text = ?, note = ?, updated_by = ?, updated_at = ?
-            WHERE id = ?
-        ''', (target_text, note, user, current_time, id))
-        
-        conn.commit()
-        conn.close()
+        with self._conn() as conn, conn:
+            conn.execute(UPDATE_QUERY, (target_text, note, user, current_time, id))
+
+    def update_translations_many(self, rows, user=None, chunk_size=BULK_CHUNK_SIZE):
+        """
+        Update many translations, chunk_size rows per transaction.
+        rows is any iterable of (id, target_text, note) tuples or dicts with
+        those keys. Returns the number of rows updated.
+        """
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        updated = 0
+        for chunk in _chunks(rows, chunk_size):
+            params = [
+                (target_text, note, user, current_time, id)
+                for id, target_text, note in (_values(row, _UPDATE_FIELDS) for row in chunk)
+            ]
+            with self._conn() as conn, immediate_transaction(conn):
+                cursor = conn.executemany(UPDATE_QUERY, params)
+                updated += cursor.rowcount
+        return updated
+
+    def _search_tokenizer(self):
+        if self._tokenizer is None:
+            self._tokenizer = search_tokenizer(self.db_path)
+        return self._tokenizer
+
+    def search(self, query, project=None, columns=SEARCH_COLUMNS, source_lang=None, target_lang=None,
+               provider=None, completed=None, page=1, page_size=20, marks=("[", "]")):
+        """
+        Full-text search, best match first.
+        Every whitespace-separated term in query must occur in one of columns;
+        the other filters are those of get_translations.
+        page is 1-based. Returns (results, has_more); each result is a dict
+        with the row's fields, score (bm25, lower is better) and a
+        "<column>_highlight" copy of every column with matches wrapped in marks.
+        """
+        if not query.split():
+            return [], False
+        sql, args, unindexed = search_query(query, self._search_tokenizer(), project, columns, source_lang,
+                                            target_lang, provider, completed, page, page_size, marks)
+        with self._conn() as conn:
+            rows = conn.execute(sql, args).fetchall()
+
+        results = []
+        for row in rows[:page_size]:
+            result = dict(zip(_RESULT_FIELDS, row))
+            for column, highlighted in zip(SEARCH_COLUMNS, row[len(_RESULT_FIELDS):]):
+                result[f"{column}_highlight"] = _mark(highlighted, unindexed, marks)
+            result["score"] = row[-1]
+            results.append(result)
+        return results, len(rows) > page_size
 
     def get_projects(self):
         """Get list of all projects"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('SELECT DISTINCT project FROM t_translations ORDER BY project')
-        projects = [row[0] for row in c.fetchall()]
-        
-        conn.close()
-        return projects
\ No newline at end of file
+        with self._conn() as conn:
+            rows = conn.execute(PROJECTS_QUERY).fetchall()
+        return [row[0] for row in rows]
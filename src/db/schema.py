@@ -1,15 +1,68 @@
 # db/schema.py
-import sqlite3
-from datetime import datetime
-from db import DB_PATH
-
-def init_db():
-    """Initialize SQLite database and create table if it doesn't exist"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Create the translations table with new schema
-    c.execute('''
+import os
+from db.connection import immediate_transaction, pooled_connection
+
+# FTS5 tokenizers for the full-text search index. trigram matches any substring of
+# three or more characters, so it works for CJK text that has no word separators;
+# unicode61 tokenizes on words and suits space-separated languages.
+SEARCH_TOKENIZERS = {
+    "trigram": "trigram",
+    "unicode61": "unicode61 remove_diacritics 2",
+}
+DEFAULT_SEARCH_TOKENIZER = "trigram"
+
+# Column weights for bm25 ranking: source_text, target_text, note
+SEARCH_RANK = "bm25(1.0, 1.0, 0.5)"
+
+
+def search_index_statements(tokenizer=None):
+    """
+    Statements creating t_translations_fts, an external-content FTS5 index
+    over source_text, target_text and note, the triggers that keep it in
+    sync with t_translations, and a rebuild from the existing rows.
+    tokenizer defaults to $TRANSLATION_SEARCH_TOKENIZER, else trigram.
+    """
+    tokenizer = tokenizer or os.getenv("TRANSLATION_SEARCH_TOKENIZER", DEFAULT_SEARCH_TOKENIZER)
+    if tokenizer not in SEARCH_TOKENIZERS:
+        raise ValueError(f"Unsupported search tokenizer: {tokenizer}")
+    return [
+        f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS t_translations_fts USING fts5(
+            source_text, target_text, note,
+            content='t_translations', content_rowid='id',
+            tokenize='{SEARCH_TOKENIZERS[tokenizer]}'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS t_translations_fts_insert AFTER INSERT ON t_translations BEGIN
+            INSERT INTO t_translations_fts (rowid, source_text, target_text, note)
+            VALUES (new.id, new.source_text, new.target_text, new.note);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS t_translations_fts_delete AFTER DELETE ON t_translations BEGIN
+            INSERT INTO t_translations_fts (t_translations_fts, rowid, source_text, target_text, note)
+            VALUES ('delete', old.id, old.source_text, old.target_text, old.note);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS t_translations_fts_update
+        AFTER UPDATE OF source_text, target_text, note ON t_translations BEGIN
+            INSERT INTO t_translations_fts (t_translations_fts, rowid, source_text, target_text, note)
+            VALUES ('delete', old.id, old.source_text, old.target_text, old.note);
+            INSERT INTO t_translations_fts (rowid, source_text, target_text, note)
+            VALUES (new.id, new.source_text, new.target_text, new.note);
+        END
+        ''',
+        f"INSERT INTO t_translations_fts (t_translations_fts, rank) VALUES ('rank', '{SEARCH_RANK}')",
+        "INSERT INTO t_translations_fts (t_translations_fts) VALUES ('rebuild')",
+    ]
+
+
+# Schema migrations, applied in order to databases whose PRAGMA user_version is lower
+MIGRATIONS = [
+    (1, [
+        '''
         CREATE TABLE IF NOT EXISTS t_translations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             project TEXT NOT NULL,
@@ -24,16 +77,256 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-    ''')
-    
-    # Create index on project for faster lookups
-    c.execute('''
+        ''',
+        '''
         CREATE INDEX IF NOT EXISTS idx_translations_project 
         ON t_translations(project)
-    ''')
-    
-    conn.commit()
-    conn.close()
+        ''',
+    ]),
+    # Indexes matching how rows are actually read: newest first within a
+    # project, by language pair, and pending (untranslated) rows
+    (2, [
+        '''
+        CREATE INDEX IF NOT EXISTS idx_translations_project_created
+        ON t_translations(project, created_at)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_translations_created
+        ON t_translations(created_at)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_translations_project_langs
+        ON t_translations(project, source_lang, target_lang, created_at)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_translations_pending
+        ON t_translations(project, created_at) WHERE target_text IS NULL
+        ''',
+        # Every lookup by project is served by the composite indexes above
+        'DROP INDEX IF EXISTS idx_translations_project',
+    ]),
+    # Full-text search; a callable step is evaluated when the migration runs
+    (3, search_index_statements),
+    # Removes a character bigram index an earlier version 4 built for short search terms:
+    # it multiplied write cost and database size, so short terms use a filtered LIKE again
+    (4, [
+        'DROP TRIGGER IF EXISTS t_translations_bigrams_insert',
+        'DROP TRIGGER IF EXISTS t_translations_bigrams_delete',
+        'DROP TRIGGER IF EXISTS t_translations_bigrams_update',
+        'DROP TABLE IF EXISTS t_translations_bigrams',
+        'DROP TABLE IF EXISTS t_bigram_positions',
+    ]),
+    # Translation memory (utils.memory), fuzzy match index (utils.fuzzy) and
+    # provider usage (utils.metering); those tables used to be created by their classes
+    (5, [
+        '''
+        CREATE TABLE IF NOT EXISTS t_translation_memory (
+            provider TEXT NOT NULL,
+            source_lang TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            source_hash TEXT NOT NULL,
+            target_text TEXT NOT NULL,
+            detected_lang TEXT,
+            note TEXT,
+            hits INTEGER DEFAULT 0,
+            last_used_at REAL NOT NULL,
+            PRIMARY KEY (provider, source_lang, target_lang, source_hash)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_translation_memory_last_used
+        ON t_translation_memory(last_used_at)
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS t_translation_alternatives (
+            provider TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            source_hash TEXT NOT NULL,
+            alternatives TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (provider, target_lang, source_hash)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS t_translation_memory_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS t_fuzzy_bands (
+            band_key INTEGER NOT NULL,
+            translation_id INTEGER NOT NULL
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_fuzzy_bands_key
+        ON t_fuzzy_bands(band_key)
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS t_fuzzy_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS t_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recorded_at TIMESTAMP NOT NULL,
+            provider TEXT NOT NULL,
+            project TEXT,
+            operation TEXT,
+            characters INTEGER NOT NULL DEFAULT 0,
+            segments INTEGER NOT NULL DEFAULT 0,
+            latency_ms REAL,
+            cache_hit INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_usage_recorded_at
+        ON t_usage(recorded_at)
+        ''',
+    ]),
+    # Saved translations whose target text was edited, queued for the translation
+    # memory, which is otherwise only seeded with new rows
+    (6, [
+        '''
+        CREATE TABLE IF NOT EXISTS t_translation_memory_edits (
+            translation_id INTEGER PRIMARY KEY
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS t_translation_memory_edits_update
+        AFTER UPDATE OF target_text ON t_translations
+        WHEN new.target_text IS NOT old.target_text BEGIN
+            INSERT OR IGNORE INTO t_translation_memory_edits (translation_id) VALUES (new.id);
+        END
+        ''',
+    ]),
+    # Per-project usage rollups read a date range of one project's rows
+    (7, [
+        '''
+        CREATE INDEX IF NOT EXISTS idx_usage_project_recorded
+        ON t_usage(project, recorded_at)
+        ''',
+    ]),
+    # Listing a language pair across all projects, newest first
+    (8, [
+        '''
+        CREATE INDEX IF NOT EXISTS idx_translations_langs
+        ON t_translations(source_lang, target_lang, created_at)
+        ''',
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def query_plan_checks():
+    """
+    (name, sql, params, tolerated) for every query shape the app runs, with
+    sample parameters. The SQL comes from the builders and constants the
+    modules execute, so the checks follow any change to those queries.
+    tolerated lists plan steps that are acceptable for that query.
+    """
+    # Imported here: these modules import db.schema themselves
+    from db.database import PROJECTS_QUERY, UPDATE_QUERY, search_query, translations_query
+    from utils.fuzzy import SYNC_QUERY, candidates_query
+    from utils.memory import EDITS_QUERY, EVICT_QUERY, LOOKUP_QUERY, SEED_QUERY
+    from utils.metering import rollup_query
+
+    cursor = ("2024-01-01 00:00:00", 1)
+    return [
+        ("recent translations in a project", *translations_query("p"), ()),
+        ("next page in a project", *translations_query("p", after=cursor), ()),
+        ("previous page in a project", *translations_query("p", before=cursor), ()),
+        # Newest rows of the whole table: the index is read in order and stops at the LIMIT
+        ("recent translations", *translations_query(),
+         ('SCAN t_translations USING INDEX idx_translations_created',)),
+        ("next page", *translations_query(after=cursor), ()),
+        ("language pair in a project", *translations_query("p", source_lang="en", target_lang="zh"), ()),
+        ("language pair", *translations_query(source_lang="en", target_lang="zh"), ()),
+        ("next page of a language pair", *translations_query(source_lang="en", target_lang="zh", after=cursor), ()),
+        ("pending translations in a project", *translations_query("p", completed=False, after=cursor), ()),
+        ("full-text search in a project", *search_query("hello world", "trigram", "p")[:2], ()),
+        ("short-term search in a project", *search_query("世", "trigram", "p")[:2], ()),
+        ("short-term search of a language pair",
+         *search_query("世", "trigram", source_lang="en", target_lang="zh")[:2], ()),
+        # One entry per project in the index
+        ("projects", PROJECTS_QUERY, (),
+         ('SCAN t_translations USING COVERING INDEX idx_translations_project_created',)),
+        ("update by id", UPDATE_QUERY, ("t", None, None, None, 1), ()),
+        ("fuzzy index sync", SYNC_QUERY, (0, 1000), ()),
+        # Grouping and ranking of the rows sharing a band with the query
+        ("fuzzy candidates", *candidates_query([1, 2, 3], "zh"),
+         ('USE TEMP B-TREE FOR GROUP BY', 'USE TEMP B-TREE FOR ORDER BY')),
+        ("translation memory lookup", LOOKUP_QUERY, ("DeepL", "en", "zh", "0" * 64), ()),
+        ("translation memory seeding", SEED_QUERY, (0, 5000), ()),
+        # The queue only holds edits made since the last sync
+        ("translation memory edits", EDITS_QUERY, (), ('SCAN e',)),
+        ("translation memory eviction", EVICT_QUERY, (100,),
+         ('SCAN t_translation_memory USING COVERING INDEX idx_translation_memory_last_used',)),
+        ("project usage", *rollup_query((), "2024-01-01", None, "p"), ()),
+        # One group per day and provider of one project's window
+        ("project usage by day", *rollup_query(("day", "provider"), "2024-01-01", None, "p"),
+         ('USE TEMP B-TREE FOR GROUP BY',)),
+    ]
+
+
+def init_db(db_path=None):
+    """Initialize SQLite database and bring its schema up to SCHEMA_VERSION"""
+    with pooled_connection(db_path) as conn:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+
+        for target_version, statements in MIGRATIONS:
+            if target_version <= version:
+                continue
+            # Each step and its version bump commit together
+            if callable(statements):
+                statements = statements()
+            with immediate_transaction(conn):
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {target_version}')
+            version = target_version
+
+
+def rebuild_search_index(tokenizer, db_path=None):
+    """Recreate the full-text search index with another tokenizer (see SEARCH_TOKENIZERS)"""
+    statements = search_index_statements(tokenizer)
+    with pooled_connection(db_path) as conn, immediate_transaction(conn):
+        for trigger in ('insert', 'delete', 'update'):
+            conn.execute(f'DROP TRIGGER IF EXISTS t_translations_fts_{trigger}')
+        conn.execute('DROP TABLE IF EXISTS t_translations_fts')
+        for statement in statements:
+            conn.execute(statement)
+
+
+def search_tokenizer(db_path=None):
+    """Tokenizer of the existing search index, or None if it has not been created"""
+    with pooled_connection(db_path) as conn:
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 't_translations_fts'").fetchone()
+    if row is None:
+        return None
+    return next((name for name, spec in SEARCH_TOKENIZERS.items() if f"tokenize='{spec}'" in row[0]), None)
+
+
+def check_query_plans(db_path=None):
+    """
+    Run EXPLAIN QUERY PLAN for every query in query_plan_checks().
+    Returns a list of (name, plan detail) problems: a table or full index
+    scan, or a temporary B-tree sort, that the check does not tolerate.
+    An empty list means every query is index-driven.
+    """
+    problems = []
+    with pooled_connection(db_path) as conn:
+        for name, sql, params, tolerated in query_plan_checks():
+            for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', tuple(params)):
+                detail = row[-1]
+                scan = detail.startswith('SCAN') and 'VIRTUAL TABLE' not in detail
+                if (scan or 'USE TEMP B-TREE' in detail) and detail not in tolerated:
+                    problems.append((name, detail))
+    return problems
+
 
 # def migrate_existing_data():
 #     """Migrate data from old schema to new schema if needed"""
@@ -77,4 +370,16 @@ def init_db():
         
 #         conn.commit()
     
-#     conn.close()
\ No newline at end of file
+#     conn.close()
+
+
+if __name__ == "__main__":
+    # python -m db.schema [DB_PATH]: migrate and verify query plans (exit status 1 on problems)
+    import sys
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    init_db(path)
+    problems = check_query_plans(path)
+    for name, detail in problems:
+        print(f"{name}: {detail}")
+    print(f"schema version {SCHEMA_VERSION}, {len(problems)} query plan problem(s)")
+    sys.exit(1 if problems else 0)
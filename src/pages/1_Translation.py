@@ -1,13 +1,22 @@
 # src/pages/1_Translation.py
 import streamlit as st
+import io
 import os
 from dotenv import load_dotenv
 from src.db.database import TranslationDB
-from src.utils.translation import create_translator, TranslationError
+from src.utils.translation import create_translator, create_translator_chain, compare_translations, TranslationError, set_current_project, get_default_memory
+from src.utils.langdetect import detect_language
+from src.utils.languages import match_language_code
+from src.utils.fuzzy import get_default_fuzzy_index
+from src.utils.segmenter import (SegmentPlan, translate_document, iter_translated_batches, most_common_language,
+                                 most_common_provider)
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Input at least this long is translated segment by segment and streamed into the output
+LONG_TEXT_CHARS = 2000
+
 st.title("Translation")
 
 # Check if project is selected
@@ -15,6 +24,9 @@ if 'current_project' not in st.session_state:
     st.error("Please select a project from the Home page first.")
     st.stop()
 
+# Provider usage from this page run is accounted to the current project
+set_current_project(st.session_state.current_project)
+
 # Initialize database
 db = TranslationDB()
 
@@ -24,8 +36,11 @@ db = TranslationDB()
 available_providers = [
     "DeepL", 
     "Google Translate", 
-    # "Microsoft Translator"
+    "Microsoft Translator"
 ]
+if os.getenv('MOCK_TRANSLATOR_URL'):
+    # Local mock server (python -m utils.mock_server) for offline testing
+    available_providers.append("Mock")
 col_target_lang, col_source_lang, col_provider_selector = st.columns(3)
 
 with col_provider_selector:
@@ -35,19 +50,38 @@ with col_provider_selector:
         index=available_providers.index("Google Translate"),  # Default to DeepL
         key="provider_select" # Add a key to help Streamlit manage state if needed
     )
+    include_alternatives = False
+    if provider_name == "DeepL":
+        # Alternatives cost extra billed API calls, so they are opt-in
+        include_alternatives = st.checkbox("Include alternative translations (extra API calls)", value=False)
 
 # Initialize translator based on selected provider
 translator = None
 source_languages = {}
 target_languages = {}
 
+# Every provider configured in .env; the ones not selected serve as fallbacks
+# while the selected provider is failing
+provider_configs = {}
+if os.getenv('DEEPL_AUTH_KEY'):
+    provider_configs["DeepL"] = {"auth_key": os.getenv('DEEPL_AUTH_KEY'), "alternatives": include_alternatives}
+if os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
+    provider_configs["Google Translate"] = {"credentials_path": os.getenv('GOOGLE_APPLICATION_CREDENTIALS')}
+if os.getenv('MS_TRANSLATOR_KEY') and os.getenv('MS_TRANSLATOR_REGION'):
+    provider_configs["Microsoft Translator"] = {
+        "api_key": os.getenv('MS_TRANSLATOR_KEY'),
+        "region": os.getenv('MS_TRANSLATOR_REGION'),
+        "endpoint": os.getenv('MS_TRANSLATOR_ENDPOINT', "https://api.cognitive.microsofttranslator.com/"), # Default endpoint
+    }
+if os.getenv('MOCK_TRANSLATOR_URL'):
+    provider_configs["Mock"] = {"server_url": os.getenv('MOCK_TRANSLATOR_URL'), "api": os.getenv('MOCK_TRANSLATOR_API', "deepl")}
+
 try:
     if provider_name == "DeepL":
         DEEPL_AUTH_KEY = os.getenv('DEEPL_AUTH_KEY')
         if not DEEPL_AUTH_KEY:
             st.error("DeepL API key not found. Please set DEEPL_AUTH_KEY in your .env file.")
             st.stop()
-        translator = create_translator("DeepL", auth_key=DEEPL_AUTH_KEY)
     
     elif provider_name == "Google Translate":
         GOOGLE_CREDENTIALS_PATH = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
@@ -55,23 +89,20 @@ try:
             st.error("Google Cloud credentials path not found. Please set GOOGLE_APPLICATION_CREDENTIALS in your .env file.")
             st.stop()
         # The GoogleTranslator class handles the credential path via os.environ or direct path
-        translator = create_translator("Google Translate", credentials_path=GOOGLE_CREDENTIALS_PATH)
-
-    # elif provider_name == "Microsoft Translator":
-    #     MS_TRANSLATOR_KEY = os.getenv('MS_TRANSLATOR_KEY')
-    #     MS_TRANSLATOR_REGION = os.getenv('MS_TRANSLATOR_REGION')
-    #     MS_TRANSLATOR_ENDPOINT = os.getenv('MS_TRANSLATOR_ENDPOINT', "https://api.cognitive.microsofttranslator.com/") # Default endpoint
-
-    #     if not MS_TRANSLATOR_KEY:
-    #         st.error("Microsoft Translator API key not found. Please set MS_TRANSLATOR_KEY in your .env file.")
-    #         st.stop()
-    #     if not MS_TRANSLATOR_REGION:
-    #         st.error("Microsoft Translator region not found. Please set MS_TRANSLATOR_REGION in your .env file.")
-    #         st.stop()
-    #     translator = create_translator("Microsoft Translator",
-    #                                    api_key=MS_TRANSLATOR_KEY,
-    #                                    region=MS_TRANSLATOR_REGION,
-    #                                    endpoint=MS_TRANSLATOR_ENDPOINT)
+
+    elif provider_name == "Microsoft Translator":
+        if not os.getenv('MS_TRANSLATOR_KEY'):
+            st.error("Microsoft Translator API key not found. Please set MS_TRANSLATOR_KEY in your .env file.")
+            st.stop()
+        if not os.getenv('MS_TRANSLATOR_REGION'):
+            st.error("Microsoft Translator region not found. Please set MS_TRANSLATOR_REGION in your .env file.")
+            st.stop()
+
+    if provider_name in provider_configs:
+        translator = create_translator_chain(
+            [(provider_name, provider_configs[provider_name])]
+            + [(name, config) for name, config in provider_configs.items() if name != provider_name]
+        )
     
     if translator:
         source_languages = translator.get_source_languages()
@@ -160,32 +191,73 @@ with col1:
         st.session_state.detected_lang_cache = ""
 
     if source_text and source_lang == "auto" and translator:
+        # Preview with the bundled offline detector: no API call while the user types.
+        # The language used for translation is still confirmed on "Translate".
+        preview_lang, preview_confidence = detect_language(source_text)
+        if preview_lang:
+            preview_code = match_language_code(preview_lang, source_languages) or preview_lang
+            st.caption(f"Detected (offline): {source_languages.get(preview_code, preview_code)} ({preview_confidence:.0%} confidence)")
+
+    # Near matches from earlier translations, shown before paying for a provider call
+    if source_text and target_lang:
+        def use_fuzzy_match(match):
+            st.session_state.translated_text = match['target_text']
+            st.session_state.translated_by = match['provider']
+            st.session_state.detected_lang_cache = match['source_lang']
+            st.session_state.alt_text = f"Reused {match['score']:.0%} match from translation #{match['id']}"
+
         try:
-            # This is a preview detection; actual detection for translation happens on button click
-            # To avoid excessive API calls, this could be debounced or manually triggered
-            # For now, let's assume it's okay for a live update if source_lang is "auto"
-            # However, the main detection will be tied to the "Translate" button.
-            # Let's make this part less aggressive or remove live auto-detection display here
-            # to prevent issues with partially typed text and API limits.
-            # We will perform detection when "Translate" is clicked if source_lang is "auto".
-            pass # Detection will occur on translate button press
-        except TranslationError as e:
-            st.warning(f"Note: Error during preliminary language detection attempt: {str(e)}")
-            # Do not stop the app, just inform the user.
+            fuzzy_matches = get_default_fuzzy_index().search(source_text, target_lang=target_lang, k=3, min_score=0.9)
+        except Exception as e:
+            fuzzy_matches = []
+            st.warning(f"Note: translation memory lookup failed: {str(e)}")
+        for match in fuzzy_matches:
+            with st.expander(f"{match['score']:.0%} match from translation memory ({match['provider']})"):
+                st.text(match['source_text'])
+                st.text(match['target_text'])
+                st.button("Use this translation", key=f"fuzzy_use_{match['id']}",
+                          on_click=use_fuzzy_match, args=(match,))
+
+    # Comparison mode sends the text to every configured provider at the same time
+    compare_mode = st.checkbox(
+        "Compare all configured providers",
+        value=False,
+        disabled=len(provider_configs) < 2,
+        key="compare_mode"
+    )
+
+    # Long documents repeat headers, footers and labels; each distinct segment is sent once
+    segment_text = st.checkbox(
+        "Split into segments and translate repeated segments once",
+        value=False,
+        key="segment_text"
+    )
+    segment_mode = "sentence"
+    if segment_text:
+        segment_mode = st.radio("Segment by", options=["sentence", "paragraph"], horizontal=True, key="segment_mode")
 
     # Translate button
     if st.button("Translate") and source_text and translator:
         if not target_lang:
             st.error("Please select a target language.")
+        elif compare_mode:
+            # Results are streamed into the comparison section below
+            st.session_state.compare_request = (source_text, target_lang, source_lang)
+        elif segment_text or len(source_text) >= LONG_TEXT_CHARS:
+            # Streamed into the output area below
+            st.session_state.stream_request = (source_text, target_lang, source_lang, segment_mode)
         else:
             try:
                 # Perform actual translation and detection (if auto)
-                translated_text_val, detected_lang_val, alt_text_val = translator.translate(
+                translated_text_val, detected_lang_val, alt_text_val, translated_by = translator.translate_with_provider(
                     source_text,
                     target_lang,
                     source_lang # Pass 'auto' if selected, translator handles detection
                 )
                 st.session_state.translated_text = translated_text_val
+                st.session_state.translated_by = translated_by # Provider that actually produced the result
+                if translated_by != provider_name:
+                    st.warning(f"{provider_name} is unavailable; translated with {translated_by} instead.")
                 st.session_state.alt_text = alt_text_val # For notes
                 if source_lang == "auto":
                     st.session_state.detected_lang_cache = detected_lang_val # Cache detected language for saving
@@ -203,6 +275,58 @@ with col1:
             except Exception as e:
                 st.error(f"An unexpected error occurred during translation ({provider_name}): {str(e)}")
 
+    # Whole documents are read line by line from the upload and segmented as they stream in
+    with st.expander("Translate a document"):
+        uploaded_document = st.file_uploader("Upload a text document", type=["txt", "md"], key="document_upload")
+        if uploaded_document and translator and target_lang and st.button("Translate document"):
+            try:
+                plan, results, providers = translate_document(
+                    translator,
+                    io.TextIOWrapper(uploaded_document, encoding="utf-8"),
+                    target_lang,
+                    source_lang,
+                    mode=segment_mode
+                )
+                translations = [result[0] if isinstance(result, tuple) else None for result in results]
+                st.session_state.translated_document = (uploaded_document.name, "".join(plan.assemble(translations)))
+                st.session_state.document_segments = (
+                    most_common_language(results) or (source_lang if source_lang != "auto" else None),
+                    target_lang,
+                    # Each segment keeps the provider that translated it, which may be a fallback
+                    [(segment, translation, provider or provider_name)
+                     for segment, translation, provider in zip(plan.unique_segments, translations, providers)
+                     if translation is not None]
+                )
+                st.caption(
+                    f"{plan.total_segments} segments, {len(plan.unique_segments)} unique: "
+                    f"sent {plan.unique_characters:,} of {plan.total_characters:,} characters"
+                )
+                document_provider = most_common_provider(providers)
+                if document_provider and document_provider != provider_name:
+                    st.warning(f"{provider_name} is unavailable; translated with {document_provider} instead.")
+            except TranslationError as e:
+                st.error(f"Translation Error ({provider_name}): {str(e)}")
+            except Exception as e:
+                st.error(f"An unexpected error occurred during translation ({provider_name}): {str(e)}")
+        if st.session_state.get('translated_document'):
+            document_name, document_text = st.session_state.translated_document
+            st.download_button("Download translation", data=document_text,
+                                file_name=f"{target_lang}_{document_name}", mime="text/plain")
+        if st.session_state.get('document_segments') and st.button("Save segments to project"):
+            segment_source_lang, segment_target_lang, segment_pairs = st.session_state.document_segments
+            try:
+                # One transaction per few thousand rows instead of one commit per segment
+                saved = db.save_translations_many(
+                    (st.session_state.current_project, segment, translation, segment_source_lang,
+                     segment_target_lang, segment_provider, None)
+                    for segment, translation, segment_provider in segment_pairs
+                )
+                st.success(f"Saved {sum(last - first + 1 for first, last in saved):,} segments")
+                get_default_fuzzy_index().sync()
+                get_default_memory().sync()
+            except Exception as e:
+                st.error(f"Error saving segments: {str(e)}")
+
     # Display cached detected language if translate button was pressed and source_lang was auto
     if st.session_state.get('detected_lang_cache') and source_lang == 'auto':
         st.info(f"Last auto-detected source language: {source_languages.get(st.session_state.detected_lang_cache, st.session_state.detected_lang_cache)}")
@@ -214,6 +338,57 @@ with col2:
     # Initialize translated text
     if 'translated_text' not in st.session_state:
         st.session_state.translated_text = ""
+
+    # Still set if the previous run was interrupted by "Stop translating"
+    stopped_stream = st.session_state.pop('stream_progress', None)
+    if stopped_stream:
+        st.warning(f"Translation stopped: kept {stopped_stream[0]} of {stopped_stream[1]} unique segments translated so far.")
+
+    stream_request = st.session_state.pop('stream_request', None)
+    if stream_request:
+        stream_text, stream_target, stream_source, stream_mode = stream_request
+        plan = SegmentPlan(stream_text, stream_mode)
+        total = len(plan.unique_segments)
+        # Clicking reruns the page, which stops this run; finished segments stay in session state
+        st.button("Stop translating", key="stop_stream")
+        progress = st.progress(0.0)
+        stream_output = st.empty()
+        st.session_state.translated_text = ""
+        st.session_state.translated_by = provider_name
+        st.session_state.alt_text = ""
+        st.session_state.detected_lang_cache = "" if stream_source == "auto" else stream_source
+        st.session_state.stream_progress = (0, total)
+        translations, results, providers = [], [], []
+        batches = iter_translated_batches(translator, plan.unique_segments, stream_target, stream_source)
+        try:
+            for batch, batch_providers in batches:
+                results.extend(batch)
+                providers.extend(batch_providers)
+                # Provider that actually produced most of the text, which may be a fallback
+                st.session_state.translated_by = most_common_provider(providers) or provider_name
+                translations.extend(result[0] if isinstance(result, tuple) else None for result in batch)
+                st.session_state.translated_text = "".join(plan.assemble(translations))
+                if stream_source == "auto" and not st.session_state.get('detected_lang_cache'):
+                    st.session_state.detected_lang_cache = most_common_language(batch) or ""
+                st.session_state.stream_progress = (len(translations), total)
+                progress.progress(len(translations) / total, text=f"{len(translations)} of {total} segments")
+                stream_output.text(st.session_state.translated_text)
+        finally:
+            batches.close()
+        del st.session_state.stream_progress
+        progress.empty()
+        stream_output.empty()
+        st.session_state.translated_text = "".join(plan.assemble(translations))
+        st.session_state.detected_lang_cache = (most_common_language(results) or "") if stream_source == "auto" else stream_source
+        if st.session_state.translated_by != provider_name:
+            st.warning(f"{provider_name} is unavailable; translated with {st.session_state.translated_by} instead.")
+        st.caption(
+            f"{plan.total_segments} segments, {total} unique: "
+            f"sent {plan.unique_characters:,} of {plan.total_characters:,} characters"
+        )
+        failed = sum(1 for text in translations if text is None)
+        if failed:
+            st.warning(f"{failed} segment(s) could not be translated and were left in the source language.")
               
     # Editable translation output
     translated_text = st.text_area(
@@ -230,6 +405,55 @@ with col2:
         height=100
     )
 
+# --- Provider comparison ---
+def use_comparison_result(name, result):
+    """Copy one provider's comparison result into the editable translation"""
+    st.session_state.translated_text, st.session_state.detected_lang_cache, st.session_state.alt_text = result
+    st.session_state.translated_by = name
+
+def show_comparison_result(name, stored):
+    status, value = stored
+    with comparison_slots[name].container():
+        if status == "error":
+            st.error(value)
+        else:
+            st.text_area(f"{name} translation", value=value[0], height=200, disabled=True, key=f"compare_text_{name}")
+            st.button("Use this translation", key=f"compare_use_{name}",
+                      on_click=use_comparison_result, args=(name, value))
+
+compare_request = st.session_state.pop('compare_request', None)
+if compare_mode and (compare_request or st.session_state.get('compare_results')):
+    st.subheader("Provider Comparison")
+    compare_names = list(provider_configs)
+    comparison_slots = {}
+    for name, compare_col in zip(compare_names, st.columns(len(compare_names))):
+        with compare_col:
+            st.markdown(f"**{name}**")
+            comparison_slots[name] = st.empty()
+
+    if compare_request:
+        compare_text, compare_target, compare_source = compare_request
+        st.session_state.compare_results = {}
+        compare_translators = {}
+        for name in compare_names:
+            try:
+                compare_translators[name] = create_translator(name, **provider_configs[name])
+                comparison_slots[name].info("Translating...")
+            except TranslationError as e:
+                st.session_state.compare_results[name] = ("error", str(e))
+                show_comparison_result(name, st.session_state.compare_results[name])
+        # Each provider's result is shown as soon as it arrives
+        for name, result in compare_translations(compare_translators, compare_text, compare_target, compare_source):
+            if isinstance(result, TranslationError):
+                st.session_state.compare_results[name] = ("error", str(result))
+            else:
+                st.session_state.compare_results[name] = ("ok", result)
+            show_comparison_result(name, st.session_state.compare_results[name])
+    else:
+        for name, stored in st.session_state.compare_results.items():
+            if name in comparison_slots:
+                show_comparison_result(name, stored)
+
 col_1, _, col_2, _ = st.columns([2,1,2,4])
 with col_1:
     st.warning("If the translation looks good to you, please click Save button !")
@@ -248,11 +472,13 @@ with col_2:
                     target_text=translated_text, # from translated_text_area
                     source_lang=final_source_lang,
                     target_lang=target_lang,
-                    provider=provider_name, # Use the selected provider_name
+                    provider=st.session_state.get('translated_by', provider_name), # Provider that produced the translation
                     note=note, # from note_area
                     user=None  # We'll add user handling later
                 )
                 st.success("Translation saved successfully!")
+                get_default_fuzzy_index().sync() # Make the new row available for near-match lookups
+                get_default_memory().sync() # Serve the saved text instead of the stale provider output
             except Exception as e:
                 st.error(f"Error saving translation: {str(e)}")
         else:
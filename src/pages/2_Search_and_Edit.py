@@ -0,0 +1,160 @@
+# src/pages/2_Search_and_Edit.py
+import html
+import sqlite3
+import streamlit as st
+from src.db.database import TranslationDB, SEARCH_COLUMNS, translation_cursor
+
+# Matches are wrapped in private-use characters so the text can be HTML-escaped
+# before they are turned into <mark> tags
+MARKS = ("\ue000", "\ue001")
+PAGE_SIZE = 20
+COLUMN_LABELS = {"source_text": "Source text", "target_text": "Target text", "note": "Note"}
+PROVIDERS = ["Any", "DeepL", "Google Translate", "Microsoft Translator", "Mock"]
+# Status filter label -> completed argument of TranslationDB.get_translations / search
+STATUSES = {"All": None, "Completed": True, "Pending": False}
+
+st.title("Search and Edit")
+
+# Check if project is selected
+if 'current_project' not in st.session_state:
+    st.error("Please select a project from the Home page first.")
+    st.stop()
+
+# Initialize database
+db = TranslationDB()
+
+
+def render_highlight(text):
+    """Highlighted search text as safe HTML"""
+    if not text:
+        return "—"
+    escaped = html.escape(text).replace("\n", "<br>")
+    return escaped.replace(MARKS[0], "<mark>").replace(MARKS[1], "</mark>")
+
+
+def show_translation(result, show_project=False):
+    """One translation with its highlighted fields and an edit form"""
+    label = (f"#{result['id']} · {result['source_lang'] or '?'} → {result['target_lang'] or '?'} · "
+             f"{result['provider']} · {result['source_text'][:80]}")
+    with st.expander(label):
+        if show_project:
+            st.caption(f"Project: {result['project']}")
+        st.markdown(f"**Source:** {render_highlight(result['source_text_highlight'])}", unsafe_allow_html=True)
+        st.markdown(f"**Target:** {render_highlight(result['target_text_highlight'])}", unsafe_allow_html=True)
+        if result['note']:
+            st.markdown(f"**Note:** {render_highlight(result['note_highlight'])}", unsafe_allow_html=True)
+
+        with st.form(key=f"edit_{result['id']}"):
+            edited_target = st.text_area("Target text", value=result['target_text'] or "")
+            edited_note = st.text_area("Note", value=result['note'] or "")
+            if st.form_submit_button("Save changes"):
+                try:
+                    db.update_translation(result['id'], edited_target or None, edited_note or None, user=None)
+                    st.success("Translation updated successfully!")
+                except Exception as e:
+                    st.error(f"Error updating translation: {str(e)}")
+        st.caption(f"Created {result['created_at']} · updated {result['updated_at']}")
+
+
+def as_result(row):
+    """A get_translations row in the shape search() returns, without highlights"""
+    (id, project, provider, source_text, target_text, source_lang, target_lang, note,
+     _, _, created_at, updated_at) = row
+    return {
+        "id": id, "project": project, "provider": provider, "source_text": source_text,
+        "target_text": target_text, "source_lang": source_lang, "target_lang": target_lang, "note": note,
+        "created_at": created_at, "updated_at": updated_at, "source_text_highlight": source_text,
+        "target_text_highlight": target_text, "note_highlight": note,
+    }
+
+
+col_query, col_columns = st.columns([3, 2])
+with col_query:
+    query = st.text_input("Search translations", placeholder="Words or phrases; leave empty to browse")
+with col_columns:
+    columns = st.multiselect("Search in", options=list(SEARCH_COLUMNS), default=list(SEARCH_COLUMNS),
+                             format_func=COLUMN_LABELS.get)
+
+col_source_lang, col_target_lang, col_provider, col_status = st.columns(4)
+with col_source_lang:
+    source_lang = st.text_input("Source language code", placeholder="any")
+with col_target_lang:
+    target_lang = st.text_input("Target language code", placeholder="any")
+with col_provider:
+    provider = st.selectbox("Provider", PROVIDERS)
+with col_status:
+    status = st.selectbox("Status", list(STATUSES))
+all_projects = st.checkbox("Search all projects", value=False)
+
+filters = {
+    "project": None if all_projects else st.session_state.current_project,
+    "source_lang": source_lang.strip() or None,
+    "target_lang": target_lang.strip() or None,
+    "provider": None if provider == "Any" else provider,
+    "completed": STATUSES[status],
+}
+
+# A new search starts again from the first page
+search_key = (query, tuple(columns), all_projects, st.session_state.current_project, *filters.values())
+if st.session_state.get('search_key') != search_key:
+    st.session_state.search_key = search_key
+    st.session_state.search_page = 1
+    st.session_state.browse_cursor = None
+
+if query.strip():
+    if not columns:
+        st.warning("Select at least one field to search in.")
+        st.stop()
+    try:
+        results, has_more = db.search(
+            query,
+            columns=columns,
+            page=st.session_state.search_page,
+            page_size=PAGE_SIZE,
+            marks=MARKS,
+            **filters
+        )
+    except sqlite3.OperationalError as e:
+        st.error(f"Search is unavailable: {str(e)}. Open the Home page once to upgrade the database.")
+        st.stop()
+
+    if not results:
+        st.info("No matching translations.")
+    for result in results:
+        show_translation(result, show_project=all_projects)
+
+    col_previous, col_page, col_next = st.columns([1, 2, 1])
+    with col_previous:
+        if st.session_state.search_page > 1 and st.button("Previous"):
+            st.session_state.search_page -= 1
+            st.rerun()
+    with col_page:
+        st.caption(f"Page {st.session_state.search_page}")
+    with col_next:
+        if has_more and st.button("Next"):
+            st.session_state.search_page += 1
+            st.rerun()
+else:
+    # Browse newest first; the cursor is ("after" or "before", (created_at, id)) of the page edge
+    direction, cursor = st.session_state.browse_cursor or (None, None)
+    rows = db.get_translations(limit=PAGE_SIZE, **({direction: cursor} if direction else {}), **filters)
+    if not rows and direction == "after":
+        st.info("No older translations.")
+    elif not rows:
+        st.info("No translations match the filters.")
+    for row in rows:
+        show_translation(as_result(row), show_project=all_projects)
+
+    if rows:
+        # Peek one row past each edge so the buttons only show when there is a page to go to
+        newer = translation_cursor(rows[0])
+        older = translation_cursor(rows[-1])
+        col_newer, _, col_older = st.columns([1, 2, 1])
+        with col_newer:
+            if db.get_translations(limit=1, before=newer, **filters) and st.button("Newer"):
+                st.session_state.browse_cursor = ("before", newer)
+                st.rerun()
+        with col_older:
+            if db.get_translations(limit=1, after=older, **filters) and st.button("Older"):
+                st.session_state.browse_cursor = ("after", older)
+                st.rerun()
@@ -0,0 +1,115 @@
+# src/pages/3_Export.py
+import csv
+import os
+import tempfile
+import streamlit as st
+from src.db.database import TranslationDB
+
+EXPORT_COLUMNS = ["id", "project", "service_provider", "source_text", "target_text", "source_lang",
+                  "target_lang", "note", "created_by", "updated_by", "created_at", "updated_at"]
+PROVIDERS = ["Any", "DeepL", "Google Translate", "Microsoft Translator", "Mock"]
+# Status filter label -> completed argument of TranslationDB.get_translations
+STATUSES = {"All": None, "Completed": True, "Pending": False}
+
+# Exports are written in parts to a private temporary directory of the session, and one
+# part at a time is handed to download_button, which holds the data it serves in memory
+EXPORT_PART_BYTES = 20 * 1024 * 1024
+# Rows written between file size checks
+_SIZE_CHECK_ROWS = 1000
+
+
+def export_dir():
+    """
+    This session's export directory. TemporaryDirectory removes it when the
+    session state is dropped, so no other session's files are ever touched.
+    """
+    if 'export_dir' not in st.session_state:
+        st.session_state.export_dir = tempfile.TemporaryDirectory(prefix="translation-export-")
+    return st.session_state.export_dir.name
+
+
+def remove_exports():
+    """Delete this session's previous export"""
+    for entry in os.scandir(export_dir()):
+        if entry.is_file():
+            os.remove(entry.path)
+    st.session_state.export_files = []
+
+
+def write_export(rows, directory):
+    """
+    Write rows as CSV files of at most about EXPORT_PART_BYTES each in directory,
+    every one starting with the header row, streaming from rows.
+    Returns (file paths, row count).
+    """
+    paths, exported = [], 0
+
+    def open_part():
+        paths.append(os.path.join(directory, f"part{len(paths) + 1}.csv"))
+        part = open(paths[-1], "w", encoding="utf-8-sig", newline="")
+        csv.writer(part).writerow(EXPORT_COLUMNS)
+        return part
+
+    export_file = open_part()
+    try:
+        writer = csv.writer(export_file)
+        for row in rows:
+            if exported and exported % _SIZE_CHECK_ROWS == 0 and export_file.tell() >= EXPORT_PART_BYTES:
+                export_file.close()
+                export_file = open_part()
+                writer = csv.writer(export_file)
+            writer.writerow(row)
+            exported += 1
+    finally:
+        export_file.close()
+    return paths, exported
+
+
+st.title("Export")
+
+# Check if project is selected
+if 'current_project' not in st.session_state:
+    st.error("Please select a project from the Home page first.")
+    st.stop()
+
+# Initialize database
+db = TranslationDB()
+
+col_source_lang, col_target_lang, col_provider, col_status = st.columns(4)
+with col_source_lang:
+    source_lang = st.text_input("Source language code", placeholder="any")
+with col_target_lang:
+    target_lang = st.text_input("Target language code", placeholder="any")
+with col_provider:
+    provider = st.selectbox("Provider", PROVIDERS)
+with col_status:
+    status = st.selectbox("Status", list(STATUSES))
+
+if st.button("Prepare CSV"):
+    filters = {
+        "project": st.session_state.current_project,
+        "source_lang": source_lang.strip() or None,
+        "target_lang": target_lang.strip() or None,
+        "provider": None if provider == "Any" else provider,
+        "completed": STATUSES[status],
+    }
+    remove_exports()
+    try:
+        st.session_state.export_files, exported = write_export(db.iter_translations(**filters), export_dir())
+    except Exception as e:
+        remove_exports()
+        st.error(f"Error exporting translations: {str(e)}")
+        st.stop()
+    st.session_state.export_name = f"{st.session_state.current_project}_translations"
+    st.caption(f"{exported:,} translations")
+
+export_files = [path for path in st.session_state.get('export_files', []) if os.path.exists(path)]
+if export_files:
+    part = 1
+    if len(export_files) > 1:
+        part = st.selectbox("Part", range(1, len(export_files) + 1),
+                            format_func=lambda number: f"Part {number} of {len(export_files)}")
+    file_name = st.session_state.export_name + (f"_part{part}" if len(export_files) > 1 else "") + ".csv"
+    # Only the selected part is read, so a rerun holds at most EXPORT_PART_BYTES of the export
+    with open(export_files[part - 1], "rb") as export_file:
+        st.download_button(f"Download {file_name}", data=export_file, file_name=file_name, mime="text/csv")
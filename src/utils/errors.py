@@ -0,0 +1,16 @@
+# src/utils/errors.py
+# No imports from the rest of the app: every module (and pages importing through
+# the src package) must share one copy of these classes for except clauses to match
+
+
+class TranslationError(Exception):
+    """Custom exception for translation errors"""
+    pass
+
+class TransientTranslationError(TranslationError):
+    """A failure that may succeed on retry or with another provider"""
+    pass
+
+class RateLimitError(TransientTranslationError):
+    """The provider kept throttling requests (HTTP 429 / quota) after retries"""
+    pass
@@ -0,0 +1,192 @@
+# src/utils/fuzzy.py
+import hashlib
+import sqlite3
+import threading
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+from db import DB_PATH
+from db.schema import init_db
+from utils.languages import language_bases, match_language_code
+from utils.memory import normalize_text
+
+# Rows fetched for re-ranking per query; keeps lookups fast for very common segments
+_MAX_CANDIDATES = 50
+
+# Batch of rows read by FuzzyIndex.sync(), in id order
+SYNC_QUERY = "SELECT id, source_text FROM t_translations WHERE id > ? ORDER BY id LIMIT ?"
+
+
+def candidates_query(band_keys: List[int], target_lang: Optional[str] = None) -> Tuple[str, list]:
+    """
+    SQL and parameters reading the translated rows that share a band with
+    the query, most shared bands first, at most _MAX_CANDIDATES of them.
+    """
+    params = list(band_keys)
+    language_filter = ""
+    if target_lang:
+        # Coarse language filter in SQL, so it applies before the candidate LIMIT;
+        # match_language_code() makes the exact decision
+        bases = language_bases(target_lang)
+        language_filter = (
+            "AND substr(lower(t.target_lang), 1, instr(t.target_lang || '-', '-') - 1)"
+            f" IN ({','.join('?' * len(bases))})"
+        )
+        params.extend(bases)
+    sql = f'''
+        SELECT t.id, t.source_text, t.target_text, t.source_lang, t.target_lang, t.service_provider
+        FROM t_fuzzy_bands b
+        JOIN t_translations t ON t.id = b.translation_id
+        WHERE b.band_key IN ({",".join("?" * len(band_keys))})
+            AND t.target_text IS NOT NULL AND t.target_text != ''
+            {language_filter}
+        GROUP BY t.id
+        ORDER BY COUNT(*) DESC
+        LIMIT ?
+    '''
+    return sql, params + [_MAX_CANDIDATES]
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    """Character n-grams of the normalized, lower-cased text"""
+    text = normalize_text(text).lower()
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class FuzzyIndex:
+    """
+    Near-match lookup over historical t_translations rows.
+
+    Each source segment gets a MinHash signature over its character trigrams,
+    split into LSH bands stored in t_fuzzy_bands. A query only reads the rows
+    sharing at least one band (an indexed lookup, independent of table size)
+    and re-ranks those candidates by edit similarity of the normalized text.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, num_bands: int = 16, rows_per_band: int = 4):
+        self.db_path = db_path or DB_PATH
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self.num_hashes = num_bands * rows_per_band
+        self._lock = threading.Lock()
+        init_db(self.db_path)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+
+    def _signature(self, shingles: set) -> List[Tuple[int, int]]:
+        """
+        One-permutation MinHash: each shingle is hashed once and kept as the
+        minimum of one of num_hashes bins; empty bins borrow the next
+        non-empty bin's value (rotation densification). Linear in text length.
+        """
+        bins: List[Optional[int]] = [None] * self.num_hashes
+        for shingle in shingles:
+            h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+            b, value = h % self.num_hashes, h // self.num_hashes
+            if bins[b] is None or value < bins[b]:
+                bins[b] = value
+        signature = []
+        for i in range(self.num_hashes):
+            for offset in range(self.num_hashes):
+                value = bins[(i + offset) % self.num_hashes]
+                if value is not None:
+                    signature.append((value, offset))
+                    break
+        return signature
+
+    def _band_keys(self, text: str) -> List[int]:
+        shingles = _shingles(text)
+        if not shingles:
+            return []
+        signature = self._signature(shingles)
+        keys = []
+        for band in range(self.num_bands):
+            rows = signature[band * self.rows_per_band:(band + 1) * self.rows_per_band]
+            digest = hashlib.blake2b(repr((band, rows)).encode('ascii'), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'big', signed=True))
+        return keys
+
+    def sync(self, batch_size: int = 5000) -> int:
+        """
+        Index rows added to t_translations since the last sync.
+        Returns the number of rows indexed.
+        """
+        indexed = 0
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM t_fuzzy_meta WHERE key = 'indexed_upto'").fetchone()
+            indexed_upto = int(row[0]) if row else 0
+            while True:
+                rows = self._conn.execute(SYNC_QUERY, (indexed_upto, batch_size)).fetchall()
+                if not rows:
+                    break
+                self._conn.executemany(
+                    "INSERT INTO t_fuzzy_bands (band_key, translation_id) VALUES (?, ?)",
+                    [(key, id) for id, source_text in rows for key in self._band_keys(source_text)]
+                )
+                indexed_upto = rows[-1][0]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO t_fuzzy_meta (key, value) VALUES ('indexed_upto', ?)",
+                    (str(indexed_upto),)
+                )
+                self._conn.commit()
+                indexed += len(rows)
+        return indexed
+
+    def search(self, text: str, target_lang: Optional[str] = None, k: int = 5,
+               min_score: float = 0.5) -> List[Dict]:
+        """
+        Top-k prior translations of segments similar to text, best first.
+        target_lang filters to compatible target languages across providers
+        (e.g. 'ZH-HANS' also matches 'zh-CN'). Each match is a dict with id,
+        score (0-1), source_text, target_text, source_lang, target_lang and provider.
+        """
+        keys = self._band_keys(text)
+        if not keys:
+            return []
+        sql, params = candidates_query(keys, target_lang)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        query = normalize_text(text).lower()
+        matches = []
+        for id, source_text, target_text, source_lang, row_target_lang, provider in rows:
+            if target_lang and not match_language_code(row_target_lang or "", {target_lang: ""}):
+                continue
+            matcher = SequenceMatcher(None, query, normalize_text(source_text).lower(), autojunk=False)
+            # The quick ratios are cheap upper bounds of ratio()
+            if matcher.real_quick_ratio() < min_score or matcher.quick_ratio() < min_score:
+                continue
+            score = matcher.ratio()
+            if score >= min_score:
+                matches.append({
+                    "id": id,
+                    "score": score,
+                    "source_text": source_text,
+                    "target_text": target_text,
+                    "source_lang": source_lang,
+                    "target_lang": row_target_lang,
+                    "provider": provider,
+                })
+        matches.sort(key=lambda match: (match["score"], match["id"]), reverse=True)
+        return matches[:k]
+
+    def best_match(self, text: str, target_lang: Optional[str] = None,
+                   min_score: float = 0.9) -> Optional[Dict]:
+        """The single best match at or above min_score, or None"""
+        matches = self.search(text, target_lang=target_lang, k=1, min_score=min_score)
+        return matches[0] if matches else None
+
+
+_default_index: Optional[FuzzyIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_default_fuzzy_index() -> FuzzyIndex:
+    """Process-wide fuzzy index over the application database"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = FuzzyIndex()
+            _default_index.sync()
+        return _default_index
@@ -0,0 +1,136 @@
+# src/utils/langdetect.py
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'language_profiles.json')
+
+# Only the start of long texts is inspected; that is plenty to identify a language
+_SAMPLE_CHARS = 2000
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+# Unicode blocks of non-Latin scripts, mapped to a script name
+_SCRIPT_RANGES = [
+    (0x0370, 0x03FF, "greek"),
+    (0x0400, 0x052F, "cyrillic"),
+    (0x0590, 0x05FF, "hebrew"),
+    (0x0600, 0x06FF, "arabic"),
+    (0x0900, 0x097F, "devanagari"),
+    (0x0E00, 0x0E7F, "thai"),
+    (0x1100, 0x11FF, "hangul"),
+    (0x3040, 0x30FF, "kana"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xAC00, 0xD7AF, "hangul"),
+    (0xF900, 0xFAFF, "han"),
+]
+
+_SCRIPT_LANGUAGES = {
+    "greek": "el",
+    "hebrew": "he",
+    "devanagari": "hi",
+    "thai": "th",
+    "hangul": "ko",
+    "kana": "ja",
+    "han": "zh",
+}
+
+
+def _script_of(char: str) -> str:
+    code = ord(char)
+    for start, end, script in _SCRIPT_RANGES:
+        if start <= code <= end:
+            return script
+    return "latin" if unicodedata.category(char).startswith("L") else ""
+
+
+class LocalLanguageDetector:
+    """
+    Offline language identifier.
+
+    Non-Latin texts are identified by Unicode script. Latin-script texts are
+    scored against per-language profiles of frequent function words and
+    distinctive letters (data/language_profiles.json). Returns ISO 639-1
+    codes with a confidence in [0, 1]; a text that fits two close languages
+    (e.g. Danish and Norwegian) gets a low confidence.
+    """
+
+    def __init__(self, profiles_path: Optional[str] = None):
+        with open(profiles_path or PROFILES_PATH, encoding='utf-8') as f:
+            profiles = json.load(f)
+        self.word_profiles: Dict[str, frozenset] = {
+            lang: frozenset(profile["words"]) for lang, profile in profiles["latin"].items()
+        }
+        self.char_profiles: Dict[str, frozenset] = {
+            lang: frozenset(profile["chars"]) for lang, profile in profiles["latin"].items()
+        }
+
+    def detect(self, text: str) -> Tuple[Optional[str], float]:
+        """Returns: (language_code, confidence), or (None, 0.0) for text without letters"""
+        sample = text[:_SAMPLE_CHARS]
+        scripts = Counter(_script_of(char) for char in sample if char.isalpha())
+        scripts.pop("", None)
+        letters = sum(scripts.values())
+        if not letters:
+            return None, 0.0
+
+        script, count = scripts.most_common(1)[0]
+        share = count / letters
+        if script in ("han", "kana") and scripts.get("kana"):
+            # Japanese mixes kanji with kana
+            return "ja", (scripts["han"] + scripts["kana"]) / letters
+        if script == "cyrillic":
+            return self._detect_cyrillic(sample), share * 0.95
+        if script == "arabic":
+            return ("fa" if any(char in sample for char in "پچژگ") else "ar"), share
+        if script != "latin":
+            return _SCRIPT_LANGUAGES[script], share
+
+        language, confidence = self._detect_latin(sample.lower())
+        return language, confidence * share
+
+    def _detect_cyrillic(self, sample: str) -> str:
+        lowered = sample.lower()
+        if any(char in lowered for char in "їєґі"):
+            return "uk"
+        if "ъ" in lowered and "ы" not in lowered:
+            return "bg"
+        return "ru"
+
+    def _detect_latin(self, sample: str) -> Tuple[Optional[str], float]:
+        words = _WORD_RE.findall(sample)
+        if not words:
+            return None, 0.0
+        chars = set(sample)
+        scores = {}
+        for lang, profile in self.word_profiles.items():
+            score = sum(1 for word in words if word in profile)
+            score += 2 * len(chars & self.char_profiles[lang])
+            scores[lang] = score
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        (best_lang, best), (_, second) = ranked[0], ranked[1]
+        if best == 0:
+            return None, 0.0
+        # Confidence grows with the margin over the runner-up and with the evidence seen
+        margin = (best - second) / best
+        evidence = min(1.0, best / 4)
+        return best_lang, (0.5 + 0.5 * margin) * evidence
+
+
+_default_detector: Optional[LocalLanguageDetector] = None
+_default_detector_lock = threading.Lock()
+
+
+def detect_language(text: str) -> Tuple[Optional[str], float]:
+    """Detect the language of text with the bundled offline profiles"""
+    global _default_detector
+    if _default_detector is None:
+        with _default_detector_lock:
+            if _default_detector is None:
+                _default_detector = LocalLanguageDetector()
+    return _default_detector.detect(text)
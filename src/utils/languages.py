@@ -0,0 +1,168 @@
+# src/utils/languages.py
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from db import DB_DIR
+
+LANGUAGE_CACHE_PATH = os.path.join(DB_DIR, 'language_cache.json')
+DEFAULT_LANGUAGE_CACHE_TTL = 24 * 3600  # seconds
+
+# How long to wait before retrying a failed background refresh
+_REFRESH_RETRY_DELAY = 60
+
+
+class LanguageCache:
+    """
+    Process-wide cache of provider language tables, persisted to a JSON file.
+
+    Fresh entries are served from memory. Once an entry is older than the TTL
+    it is still served, and a background thread refreshes it, so a page rerun
+    never waits on the network for language metadata. If the provider is
+    unreachable the stale table keeps being served.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None):
+        self.path = path or LANGUAGE_CACHE_PATH
+        if ttl is None:
+            ttl = float(os.getenv('LANGUAGE_CACHE_TTL', DEFAULT_LANGUAGE_CACHE_TTL))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Dict[str, str]]] = self._load()
+        self._refreshing = set()
+        self._retry_after: Dict[str, float] = {}
+
+    def _load(self) -> Dict[str, Tuple[float, Dict[str, str]]]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            return {key: (entry['fetched_at'], entry['languages']) for key, entry in data.items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing or unreadable cache file: start empty
+            return {}
+
+    def _save(self):
+        data = {key: {'fetched_at': fetched_at, 'languages': languages}
+                for key, (fetched_at, languages) in self._entries.items()}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The on-disk copy is an optimisation; the in-memory cache still works
+            pass
+
+    def get(self, key: str, fetch: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+        """
+        Return the language table stored under key.
+        fetch is called synchronously only when nothing is cached yet;
+        stale entries are refreshed in the background.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                fetched_at, languages = entry
+                now = time.time()
+                if (now - fetched_at > self.ttl and key not in self._refreshing
+                        and now >= self._retry_after.get(key, 0)):
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+                return dict(languages)
+
+        languages = fetch()
+        self._store(key, languages)
+        return dict(languages)
+
+    def _refresh(self, key: str, fetch: Callable[[], Dict[str, str]]):
+        try:
+            languages = fetch()
+        except Exception:
+            with self._lock:
+                self._retry_after[key] = time.time() + _REFRESH_RETRY_DELAY
+            return
+        else:
+            self._store(key, languages)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key: str, languages: Dict[str, str]):
+        with self._lock:
+            self._entries[key] = (time.time(), dict(languages))
+            self._retry_after.pop(key, None)
+            self._save()
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one entry, or the whole cache when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._save()
+
+
+# Codes that name the same language differently across providers
+_LANGUAGE_ALIASES = {
+    'zh-hans': ['zh-cn', 'zh'],
+    'zh-hant': ['zh-tw'],
+    'zh-cn': ['zh-hans', 'zh'],
+    'zh-tw': ['zh-hant'],
+    'zh': ['zh-hans', 'zh-cn'],
+    'en': ['en-us', 'en-gb'],
+    'pt': ['pt-br', 'pt-pt'],
+    'he': ['iw'],
+    'iw': ['he'],
+    'nb': ['no'],
+    'no': ['nb'],
+}
+
+
+def match_language_code(code: str, languages: Dict[str, str]) -> Optional[str]:
+    """
+    Map a language code from one provider to the closest code in another
+    provider's language table (e.g. DeepL 'ZH-HANS' -> Google 'zh-CN').
+    Returns None if the language is not available.
+    """
+    if not code:
+        return None
+    if code in languages:
+        return code
+    by_lower = {available.lower(): available for available in languages}
+    wanted = code.lower()
+    for candidate in [wanted] + _LANGUAGE_ALIASES.get(wanted, []):
+        if candidate in by_lower:
+            return by_lower[candidate]
+    base = wanted.split('-')[0]
+    if base in by_lower:
+        return by_lower[base]
+    variants = sorted(available for lower, available in by_lower.items() if lower.split('-')[0] == base)
+    return variants[0] if variants else None
+
+
+def language_bases(code: str) -> List[str]:
+    """
+    Lower-case base codes (the part before '-') of every code that
+    match_language_code() can pair with code, e.g. 'he' -> ['he', 'iw'].
+    """
+    wanted = code.lower()
+    bases = {wanted.split('-')[0]}
+    for alias in _LANGUAGE_ALIASES.get(wanted, []) + _LANGUAGE_ALIASES.get(wanted.split('-')[0], []):
+        bases.add(alias.split('-')[0])
+    return sorted(bases)
+
+
+_default_cache: Optional[LanguageCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_language_cache() -> LanguageCache:
+    """Process-wide language cache backed by the file next to the database"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LanguageCache()
+        return _default_cache
@@ -0,0 +1,258 @@
+# src/utils/memory.py
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from db import DB_PATH
+from db.connection import immediate_transaction, pooled_connection
+from db.schema import init_db
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Statements run by TranslationMemory, also checked by db.schema.check_query_plans()
+LOOKUP_QUERY = '''
+    SELECT target_text, detected_lang, note FROM t_translation_memory
+    WHERE provider = ? AND source_lang = ? AND target_lang = ? AND source_hash = ?
+'''
+SEED_QUERY = '''
+    SELECT id, service_provider, source_text, target_text, source_lang, target_lang
+    FROM t_translations
+    WHERE id > ? AND target_text IS NOT NULL AND target_text != ''
+    ORDER BY id LIMIT ?
+'''
+EDITS_QUERY = '''
+    SELECT t.service_provider, t.source_text, t.target_text, t.source_lang, t.target_lang
+    FROM t_translation_memory_edits e
+    JOIN t_translations t ON t.id = e.translation_id
+'''
+# Delete an exact number of rows: a seeded batch shares one last_used_at,
+# so cutting at a timestamp could drop far more than intended
+EVICT_QUERY = '''
+    DELETE FROM t_translation_memory
+    WHERE (provider, source_lang, target_lang, source_hash) IN (
+        SELECT provider, source_lang, target_lang, source_hash FROM t_translation_memory
+        ORDER BY last_used_at LIMIT ?
+    )
+'''
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for exact matching (NFC, trimmed, collapsed whitespace)"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_hash(text: str) -> str:
+    """Stable hash of the normalized text, used as the memory lookup key"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """
+    Exact-match translation memory stored next to t_translations.
+
+    Entries are keyed by (provider, source_lang, target_lang, hash of the
+    normalized source text). Lookups run on pooled connections (see
+    db.connection) so a hit never touches the network. The store is seeded
+    from saved translations and evicts least-recently-used entries once it
+    grows past max_entries.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 100_000, seed: bool = True):
+        self.db_path = db_path or DB_PATH
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._touched: Dict[Tuple[str, str, str, str], float] = {}
+        init_db(self.db_path)
+        with pooled_connection(self.db_path) as conn:
+            self._size = conn.execute("SELECT COUNT(*) FROM t_translation_memory").fetchone()[0]
+        if seed:
+            self.sync()
+
+    def sync(self, batch_size: int = 5000) -> int:
+        """
+        Seed the memory from rows saved to t_translations since the last sync,
+        batch_size rows at a time in id order. Returns the number of rows imported.
+        """
+        imported = 0
+        with self._lock, pooled_connection(self.db_path) as conn:
+            row = conn.execute("SELECT value FROM t_translation_memory_meta WHERE key = 'seeded_upto'").fetchone()
+            seeded_upto = int(row[0]) if row else 0
+            while True:
+                rows = conn.execute(SEED_QUERY, (seeded_upto, batch_size)).fetchall()
+                if not rows:
+                    break
+                now = time.time()
+                # Each batch and its progress marker commit together
+                with immediate_transaction(conn):
+                    for id, provider, source_text, target_text, source_lang, target_lang in rows:
+                        if not source_lang or not target_lang:
+                            continue
+                        key_hash = text_hash(source_text)
+                        # A saved row answers both an explicit-language and an auto-detect request
+                        for lang in (source_lang, "auto"):
+                            self._insert(conn, provider, lang, target_lang, key_hash, target_text, source_lang, "", now)
+                    seeded_upto = rows[-1][0]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO t_translation_memory_meta (key, value) VALUES ('seeded_upto', ?)",
+                        (str(seeded_upto),)
+                    )
+                imported += len(rows)
+                self._evict_if_needed(conn)
+            self._apply_edits(conn)
+            self._evict_if_needed(conn)
+        return imported
+
+    def _apply_edits(self, conn):
+        """
+        Bring entries up to date with saved translations edited since they were
+        seeded (queued in t_translation_memory_edits by a trigger); an entry
+        whose saved translation was cleared is dropped.
+        """
+        # The queue is read and emptied in one write transaction, so no edit queued meanwhile is lost
+        with immediate_transaction(conn):
+            rows = conn.execute(EDITS_QUERY).fetchall()
+            now = time.time()
+            for provider, source_text, target_text, source_lang, target_lang in rows:
+                if not source_lang or not target_lang:
+                    continue
+                key_hash = text_hash(source_text)
+                for lang in (source_lang, "auto"):
+                    if target_text:
+                        self._insert(conn, provider, lang, target_lang, key_hash, target_text, source_lang, "", now)
+                    else:
+                        c = conn.execute('''
+                            DELETE FROM t_translation_memory
+                            WHERE provider = ? AND source_lang = ? AND target_lang = ? AND source_hash = ?
+                        ''', (provider, lang, target_lang, key_hash))
+                        self._size -= c.rowcount
+            conn.execute("DELETE FROM t_translation_memory_edits")
+
+    def _edits_pending(self, conn) -> bool:
+        return conn.execute("SELECT 1 FROM t_translation_memory_edits LIMIT 1").fetchone() is not None
+
+    def get(self, provider: str, text: str, target_lang: str,
+            source_lang: str = "auto") -> Optional[Tuple[str, str, str]]:
+        """
+        Look up a stored translation.
+        Returns: (translated_text, detected_language, alternatives_note) or None
+        """
+        key = (provider, source_lang or "auto", target_lang, text_hash(text))
+        with self._lock, pooled_connection(self.db_path) as conn:
+            # Saved translations edited elsewhere (e.g. Search and Edit) win over stored provider output
+            if self._edits_pending(conn):
+                self._apply_edits(conn)
+            row = conn.execute(LOOKUP_QUERY, key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Recency updates are batched and written on the next put to keep hits read-only
+            self._touched[key] = time.time()
+        target_text, detected_lang, note = row
+        return target_text, detected_lang or source_lang, note or ""
+
+    def put(self, provider: str, text: str, target_lang: str, source_lang: str,
+            result: Tuple[str, str, str]):
+        """Store a provider result for the given request"""
+        translated_text, detected_lang, note = result
+        if not translated_text:
+            return
+        key_hash = text_hash(text)
+        source_lang = source_lang or "auto"
+        now = time.time()
+        with self._lock, pooled_connection(self.db_path) as conn:
+            with immediate_transaction(conn):
+                self._insert(conn, provider, source_lang, target_lang, key_hash, translated_text, detected_lang,
+                             note, now)
+                if source_lang == "auto" and detected_lang and detected_lang != "auto":
+                    self._insert(conn, provider, detected_lang, target_lang, key_hash, translated_text,
+                                 detected_lang, note, now)
+                self._flush_touched(conn)
+            self._evict_if_needed(conn)
+
+    def get_alternatives(self, provider: str, text: str, target_lang: str) -> Optional[List[str]]:
+        """Stored alternative translations of text, or None if never fetched"""
+        with pooled_connection(self.db_path) as conn:
+            row = conn.execute('''
+                SELECT alternatives FROM t_translation_alternatives
+                WHERE provider = ? AND target_lang = ? AND source_hash = ?
+            ''', (provider, target_lang, text_hash(text))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_alternatives(self, provider: str, text: str, target_lang: str, alternatives: List[str]):
+        """Store alternative translations of text; an empty list is stored too"""
+        with pooled_connection(self.db_path) as conn, conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO t_translation_alternatives
+                (provider, target_lang, source_hash, alternatives, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (provider, target_lang, text_hash(text), json.dumps(alternatives, ensure_ascii=False), time.time()))
+
+    def _insert(self, conn, provider, source_lang, target_lang, key_hash, target_text, detected_lang, note, now):
+        c = conn.execute('''
+            UPDATE t_translation_memory
+            SET target_text = ?, detected_lang = ?, note = ?, last_used_at = ?
+            WHERE provider = ? AND source_lang = ? AND target_lang = ? AND source_hash = ?
+        ''', (target_text, detected_lang, note, now, provider, source_lang, target_lang, key_hash))
+        if c.rowcount == 0:
+            conn.execute('''
+                INSERT INTO t_translation_memory
+                (provider, source_lang, target_lang, source_hash, target_text, detected_lang, note, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (provider, source_lang, target_lang, key_hash, target_text, detected_lang, note, now))
+            self._size += 1
+
+    def _flush_touched(self, conn):
+        if not self._touched:
+            return
+        conn.executemany('''
+            UPDATE t_translation_memory SET last_used_at = ?, hits = hits + 1
+            WHERE provider = ? AND source_lang = ? AND target_lang = ? AND source_hash = ?
+        ''', [(ts,) + key for key, ts in self._touched.items()])
+        self._touched.clear()
+
+    def _evict_if_needed(self, conn):
+        """Drop the least recently used entries down to 90% of max_entries"""
+        if self._size <= self.max_entries:
+            return
+        keep = int(self.max_entries * 0.9)
+        with immediate_transaction(conn):
+            c = conn.execute(EVICT_QUERY, (self._size - keep,))
+            self.evictions += c.rowcount
+            self._size = conn.execute("SELECT COUNT(*) FROM t_translation_memory").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._size,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        """Write pending recency updates; connections belong to the pool and stay open"""
+        with self._lock, pooled_connection(self.db_path) as conn, immediate_transaction(conn):
+            self._flush_touched(conn)
+
+
+_default_memory: Optional[TranslationMemory] = None
+_default_memory_lock = threading.Lock()
+
+
+def get_default_memory() -> TranslationMemory:
+    """Process-wide translation memory backed by the application database"""
+    global _default_memory
+    with _default_memory_lock:
+        if _default_memory is None:
+            _default_memory = TranslationMemory()
+        return _default_memory
@@ -0,0 +1,216 @@
+# src/utils/metering.py
+import atexit
+import contextvars
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from db import DB_PATH
+from db.schema import init_db
+
+# Project the current session is translating for; read when a call is metered
+_current_project: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_project", default=None)
+
+# Grouping keys accepted by UsageMeter.rollup
+_ROLLUP_COLUMNS = {
+    "day": "date(recorded_at)",
+    "project": "project",
+    "provider": "provider",
+}
+
+_FLUSH = object()
+_STOP = object()
+
+
+def set_current_project(project: Optional[str]):
+    """Attribute calls made from this context (e.g. a page run) to project"""
+    _current_project.set(project)
+
+
+def get_current_project() -> Optional[str]:
+    return _current_project.get()
+
+
+@contextmanager
+def project_scope(project: Optional[str]):
+    """Attribute calls made inside the block to project"""
+    token = _current_project.set(project)
+    try:
+        yield
+    finally:
+        _current_project.reset(token)
+
+
+def rollup_query(group_by: Sequence[str] = ("day", "project", "provider"), since: Optional[str] = None,
+                 until: Optional[str] = None, project: Optional[str] = None) -> Tuple[str, list]:
+    """SQL and parameters of UsageMeter.rollup()"""
+    unknown = [key for key in group_by if key not in _ROLLUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unsupported rollup keys: {', '.join(unknown)}")
+    columns = [f"{_ROLLUP_COLUMNS[key]} AS {key}" for key in group_by]
+    conditions, params = [], []
+    # Compare recorded_at itself rather than date(recorded_at) so the indexes apply
+    if since:
+        conditions.append("recorded_at >= ?")
+        params.append(since)
+    if until:
+        conditions.append("recorded_at < date(?, '+1 day')")
+        params.append(until)
+    if project is not None:
+        conditions.append("project = ?")
+        params.append(project)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    group = f"GROUP BY {', '.join(_ROLLUP_COLUMNS[key] for key in group_by)}" if group_by else ""
+    order = f"ORDER BY {', '.join(_ROLLUP_COLUMNS[key] for key in group_by)}" if group_by else ""
+    sql = f'''
+        SELECT {''.join(column + ', ' for column in columns)}
+            SUM(1 - cache_hit) AS requests,
+            SUM(CASE WHEN cache_hit THEN 0 ELSE characters END) AS billed_characters,
+            SUM(CASE WHEN cache_hit THEN characters ELSE 0 END) AS cached_characters,
+            SUM(segments) AS segments,
+            SUM(cache_hit) AS cache_hits,
+            AVG(CASE WHEN cache_hit THEN NULL ELSE latency_ms END) AS avg_latency_ms
+        FROM t_usage
+        {where}
+        {group}
+        {order}
+    '''
+    return sql, params
+
+
+class UsageMeter:
+    """
+    Accounting of provider usage, stored in t_usage next to t_translations.
+
+    Each billed call (or cache hit that avoided one) is one row with the
+    provider, project, characters, segments, latency and whether it was
+    served from cache. record() only enqueues; a background writer inserts
+    rows in batches, so metering never puts a database write on the
+    translation path.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = 2.0, batch_size: int = 500):
+        self.db_path = db_path or DB_PATH
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=100_000)
+        init_db(self.db_path)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name="UsageMeter", daemon=True)
+        self._writer.start()
+
+    def record(self, provider: str, characters: int, segments: int = 1, latency: Optional[float] = None,
+               cache_hit: bool = False, operation: Optional[str] = None, project: Optional[str] = None):
+        """
+        Queue one usage row. latency is in seconds; project defaults to the
+        current project context. Never blocks: if the writer has fallen far
+        behind, the row is dropped and counted in self.dropped.
+        """
+        row = (
+            datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            provider,
+            project if project is not None else _current_project.get(),
+            operation,
+            characters,
+            segments,
+            None if latency is None else latency * 1000,
+            int(cache_hit),
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            rows, waiters, stop = [], [], False
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    rows.append(item)
+                if stop or waiters or len(rows) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            self._write(rows)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def _write(self, rows: List[tuple]):
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._conn.executemany('''
+                    INSERT INTO t_usage
+                    (recorded_at, provider, project, operation, characters, segments, latency_ms, cache_hit)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                self._conn.commit()
+        except sqlite3.Error:
+            # Accounting must never take the application down; the rows are lost
+            self.dropped += len(rows)
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until every row recorded so far has been written"""
+        if not self._writer.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        """Write pending rows and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(5.0)
+        with self._lock:
+            self._conn.close()
+
+    def rollup(self, group_by: Sequence[str] = ("day", "project", "provider"),
+               since: Optional[str] = None, until: Optional[str] = None,
+               project: Optional[str] = None) -> List[Dict]:
+        """
+        Usage totals grouped by any of "day", "project" and "provider".
+        since/until are inclusive 'YYYY-MM-DD' dates (UTC). Each row has the
+        grouping keys plus requests, billed_characters, cached_characters,
+        segments, cache_hits and avg_latency_ms.
+        """
+        sql, params = rollup_query(group_by, since, until, project)
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+_default_meter: Optional[UsageMeter] = None
+_default_meter_lock = threading.Lock()
+
+
+def get_default_meter() -> UsageMeter:
+    """Process-wide usage meter backed by the application database"""
+    global _default_meter
+    with _default_meter_lock:
+        if _default_meter is None:
+            _default_meter = UsageMeter()
+            atexit.register(_default_meter.close)
+        return _default_meter
@@ -0,0 +1,319 @@
+# src/utils/mock_server.py
+"""
+Local stand-in for the DeepL, Google Translate and Microsoft Translator APIs.
+
+Serves DeepL-shaped (/v2/translate, /v2/languages), Google v2-shaped
+(/language/translate/v2, .../languages, .../detect) and Microsoft v3-shaped
+(/translate, /languages, /detect) endpoints with
+deterministic pseudo-translations, configurable latency and injected
+429 / 5xx responses, so batching, concurrency and retry behaviour can be
+benchmarked offline and reproducibly.
+
+Run from src/:
+    python -m utils.mock_server --port 8765 --latency lognormal:0.05:0.5 --error-429 0.05
+"""
+import argparse
+import codecs
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from utils.langdetect import detect_language
+
+# (code, name) pairs served by the languages endpoints; DeepL codes are upper case
+MOCK_LANGUAGES = [
+    ("ar", "Arabic"),
+    ("de", "German"),
+    ("en", "English"),
+    ("es", "Spanish"),
+    ("fr", "French"),
+    ("it", "Italian"),
+    ("ja", "Japanese"),
+    ("ko", "Korean"),
+    ("nl", "Dutch"),
+    ("pt", "Portuguese"),
+    ("ru", "Russian"),
+    ("zh", "Chinese"),
+]
+
+
+def pseudo_translate(text: str, target_lang: str) -> str:
+    """Deterministic fake translation: target tag plus ROT13 of the text"""
+    return f"[{target_lang.upper()}] {codecs.encode(text, 'rot13')}"
+
+
+class LatencyModel:
+    """
+    Response delay distribution, in seconds.
+    spec is "fixed:S", "uniform:LOW:HIGH" or "lognormal:MEDIAN:SIGMA";
+    per_char adds a delay per character of request text.
+    """
+
+    def __init__(self, spec: str = "fixed:0", per_char: float = 0.0):
+        kind, *params = spec.split(":")
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unsupported latency distribution: {kind}")
+        self.kind = kind
+        self.params = [float(param) for param in params]
+        self.per_char = per_char
+
+    def sample(self, rng: random.Random, characters: int = 0) -> float:
+        if self.kind == "fixed":
+            delay = self.params[0] if self.params else 0.0
+        elif self.kind == "uniform":
+            delay = rng.uniform(self.params[0], self.params[1])
+        else:
+            median, sigma = self.params
+            delay = median * rng.lognormvariate(0.0, sigma)
+        return delay + self.per_char * characters
+
+
+class MockServer(ThreadingHTTPServer):
+    """HTTP server holding the mock's configuration, random source and counters"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: Optional[LatencyModel] = None,
+                 error_429: float = 0.0, error_5xx: float = 0.0, retry_after: int = 1,
+                 seed: Optional[int] = 0):
+        super().__init__(address, MockRequestHandler)
+        self.latency = latency or LatencyModel()
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self, characters: int) -> Tuple[float, Optional[int]]:
+        """Latency and injected error status (None for success) for one request"""
+        with self._lock:
+            delay = self.latency.sample(self.rng, characters)
+            roll = self.rng.random()
+        if roll < self.error_429:
+            return delay, 429
+        if roll < self.error_429 + self.error_5xx:
+            return delay, 503
+        return delay, None
+
+    def count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def start(self) -> "MockServer":
+        """Serve from a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name="MockServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    server: MockServer
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+    def _params(self) -> Dict:
+        """Query string and body (JSON or form encoded) merged into one dict"""
+        parsed = urlparse(self.path)
+        params: Dict = {key: values if len(values) > 1 else values[0]
+                        for key, values in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8")
+            if "json" in (self.headers.get("Content-Type") or ""):
+                payload = json.loads(body)
+                if isinstance(payload, list):
+                    # Microsoft sends a list of {"Text": ...} elements
+                    params["items"] = payload
+                else:
+                    params.update(payload)
+            else:
+                params.update({key: values if len(values) > 1 else values[0]
+                               for key, values in parse_qs(body).items()})
+        return params
+
+    def _send(self, status: int, payload, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        path = urlparse(self.path).path.rstrip("/")
+        routes = {
+            "/v2/translate": self._deepl_translate,
+            "/v2/languages": self._deepl_languages,
+            "/language/translate/v2": self._google_translate,
+            "/language/translate/v2/languages": self._google_languages,
+            "/language/translate/v2/detect": self._google_detect,
+            "/translate": self._microsoft_translate,
+            "/languages": self._microsoft_languages,
+            "/detect": self._microsoft_detect,
+        }
+        handler = routes.get(path)
+        if handler is None:
+            self._send(404, {"message": f"Unknown endpoint {path}"})
+            return
+        try:
+            params = self._params()
+        except (ValueError, UnicodeDecodeError):
+            self._send(400, {"message": "Malformed request body"})
+            return
+        if "items" in params:
+            texts = [item.get("Text", "") for item in params["items"]]
+        else:
+            texts = _as_list(params.get("text", params.get("q", [])))
+        characters = sum(len(text) for text in texts) * max(1, len(_as_list(params.get("to"))))
+        delay, error = self.server.draw(characters)
+        self.server.count(f"requests {path}")
+        time.sleep(delay)
+        if error == 429:
+            self.server.count("status 429")
+            self._send(429, {"message": "Too many requests"}, {"Retry-After": str(self.server.retry_after)})
+            return
+        if error is not None:
+            self.server.count(f"status {error}")
+            self._send(error, {"message": "Service temporarily unavailable"})
+            return
+        self.server.count("status 200")
+        self.server.count("characters", characters)
+        self.server.count("segments", len(texts))
+        handler(params, texts)
+
+    def _deepl_translate(self, params: Dict, texts: List[str]):
+        target = params.get("target_lang")
+        if not texts or not target:
+            self._send(400, {"message": "Parameters text and target_lang are required"})
+            return
+        source = params.get("source_lang")
+        self._send(200, {"translations": [
+            {"detected_source_language": (source or _detect(text)).upper(), "text": pseudo_translate(text, target)}
+            for text in texts
+        ]})
+
+    def _deepl_languages(self, params: Dict, texts: List[str]):
+        languages = [{"language": code.upper(), "name": name} for code, name in MOCK_LANGUAGES]
+        if params.get("type") == "target":
+            for language in languages:
+                language["supports_formality"] = False
+        self._send(200, languages)
+
+    def _google_translate(self, params: Dict, texts: List[str]):
+        target = params.get("target")
+        if not texts or not target:
+            self._send(400, {"error": {"code": 400, "message": "Parameters q and target are required"}})
+            return
+        translations = []
+        for text in texts:
+            translation = {"translatedText": pseudo_translate(text, target)}
+            if not params.get("source"):
+                translation["detectedSourceLanguage"] = _detect(text)
+            translations.append(translation)
+        self._send(200, {"data": {"translations": translations}})
+
+    def _google_languages(self, params: Dict, texts: List[str]):
+        self._send(200, {"data": {"languages": [{"language": code, "name": name} for code, name in MOCK_LANGUAGES]}})
+
+    def _google_detect(self, params: Dict, texts: List[str]):
+        self._send(200, {"data": {"detections": [
+            [{"language": _detect(text), "confidence": 1.0, "isReliable": True}] for text in texts
+        ]}})
+
+    def _microsoft_translate(self, params: Dict, texts: List[str]):
+        targets = _as_list(params.get("to"))
+        if not texts or not targets:
+            self._send(400, {"error": {"code": 400000, "message": "Parameters to and a text body are required"}})
+            return
+        results = []
+        for text in texts:
+            result = {"translations": [{"text": pseudo_translate(text, target), "to": target} for target in targets]}
+            if not params.get("from"):
+                result["detectedLanguage"] = {"language": _detect(text), "score": 1.0}
+            results.append(result)
+        self._send(200, results)
+
+    def _microsoft_languages(self, params: Dict, texts: List[str]):
+        self._send(200, {"translation": {
+            code: {"name": name, "nativeName": name, "dir": "rtl" if code == "ar" else "ltr"}
+            for code, name in MOCK_LANGUAGES
+        }})
+
+    def _microsoft_detect(self, params: Dict, texts: List[str]):
+        self._send(200, [{"language": _detect(text), "score": 1.0, "isTranslationSupported": True} for text in texts])
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, list) else [value]
+
+
+def _detect(text: str) -> str:
+    code, _ = detect_language(text)
+    return code or "en"
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, latency: str = "fixed:0",
+                      per_char_latency: float = 0.0, error_429: float = 0.0, error_5xx: float = 0.0,
+                      retry_after: int = 1, seed: Optional[int] = 0) -> MockServer:
+    """Start a mock server in a background thread; port 0 picks a free port (see .url)"""
+    server = MockServer((host, port), LatencyModel(latency, per_char_latency),
+                        error_429=error_429, error_5xx=error_5xx, retry_after=retry_after, seed=seed)
+    return server.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock DeepL / Google Translate server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0",
+                        help='"fixed:S", "uniform:LOW:HIGH" or "lognormal:MEDIAN:SIGMA" (seconds)')
+    parser.add_argument("--per-char-latency", type=float, default=0.0, help="extra seconds per character")
+    parser.add_argument("--error-429", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for reproducible runs")
+    args = parser.parse_args()
+
+    server = MockServer((args.host, args.port), LatencyModel(args.latency, args.per_char_latency),
+                        error_429=args.error_429, error_5xx=args.error_5xx,
+                        retry_after=args.retry_after, seed=args.seed)
+    print(f"Mock translation server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(dict(server.stats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
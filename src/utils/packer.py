@@ -0,0 +1,128 @@
+# src/utils/packer.py
+import json
+import re
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from utils.segmenter import iter_segments
+
+_WORD_RE = re.compile(r"\S+\s*|\s+")
+
+
+class RequestLimits:
+    """
+    Size limits a provider enforces on a single translation request.
+
+    max_bytes is measured as the JSON-encoded request body (non-ASCII text is
+    escaped, so a CJK character costs 6 bytes); request_overhead reserves room
+    for the non-text fields. None means the provider has no such limit.
+    """
+
+    def __init__(self, max_segments: int, max_bytes: Optional[int] = None,
+                 max_characters: Optional[int] = None, request_overhead: int = 512):
+        self.max_segments = max_segments
+        self.max_bytes = max_bytes
+        self.max_characters = max_characters
+        self.request_overhead = request_overhead
+
+    def __repr__(self) -> str:
+        return (f"RequestLimits(max_segments={self.max_segments}, max_bytes={self.max_bytes}, "
+                f"max_characters={self.max_characters})")
+
+    def segment_bytes(self, text: str) -> int:
+        """Bytes text adds to the request body: a JSON string plus its separator"""
+        return len(json.dumps(text)) + 1
+
+    def fits(self, text: str) -> bool:
+        """Whether text can be sent on its own in one request"""
+        if self.max_characters is not None and len(text) > self.max_characters:
+            return False
+        if self.max_bytes is not None and self.request_overhead + self.segment_bytes(text) > self.max_bytes:
+            return False
+        return True
+
+
+def pack_requests(items: Iterable[Tuple[Any, str]], limits: RequestLimits) -> Iterator[List[Tuple[Any, str]]]:
+    """
+    Group (key, text) items into requests, in order, each as full as the
+    limits allow. Filling greedily gives the fewest requests possible for an
+    order-preserving split. Every text must fit a request on its own (see
+    split_oversized).
+    """
+    request: List[Tuple[Any, str]] = []
+    request_bytes = limits.request_overhead
+    request_chars = 0
+    for key, text in items:
+        size = limits.segment_bytes(text)
+        if request and (
+            len(request) >= limits.max_segments
+            or (limits.max_bytes is not None and request_bytes + size > limits.max_bytes)
+            or (limits.max_characters is not None and request_chars + len(text) > limits.max_characters)
+        ):
+            yield request
+            request, request_bytes, request_chars = [], limits.request_overhead, 0
+        request.append((key, text))
+        request_bytes += size
+        request_chars += len(text)
+    if request:
+        yield request
+
+
+def _split_units(unit: str, limits: RequestLimits) -> List[str]:
+    """Break a unit that does not fit into words, and words into character runs"""
+    words = _WORD_RE.findall(unit)
+    if len(words) > 1:
+        return words
+    parts, start = [], 0
+    while start < len(unit):
+        # Longest run from start that still fits
+        low, high = start + 1, len(unit)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if limits.fits(unit[start:middle]):
+                low = middle
+            else:
+                high = middle - 1
+        parts.append(unit[start:low])
+        start = low
+    return parts
+
+
+def split_oversized(text: str, limits: RequestLimits) -> List[Tuple[str, str, str]]:
+    """
+    Split a text too large for one request into (prefix, body, suffix) pieces
+    that each fit. Cuts fall between sentences where possible, then between
+    words; only the body of a piece is sent, and prefix + translation + suffix
+    of every piece, concatenated, rebuilds the translated text.
+    """
+    units = [segment + separator for segment, separator in iter_segments(text, "sentence")]
+    units.reverse()
+    pieces: List[Tuple[str, str, str]] = []
+    current = ""
+    leading = ""
+
+    def flush(chunk: str):
+        nonlocal leading
+        body = chunk.strip()
+        if not body:
+            # Whitespace between pieces travels with its neighbours, unsent
+            if pieces:
+                prefix, last_body, suffix = pieces[-1]
+                pieces[-1] = (prefix, last_body, suffix + chunk)
+            else:
+                leading += chunk
+            return
+        start = chunk.index(body)
+        pieces.append((leading + chunk[:start], body, chunk[start + len(body):]))
+        leading = ""
+
+    while units:
+        unit = units.pop()
+        if limits.fits((current + unit).strip()):
+            current += unit
+        elif limits.fits(unit.strip()):
+            flush(current)
+            current = unit
+        else:
+            units.extend(reversed(_split_units(unit, limits)))
+    flush(current)
+    return pieces
@@ -0,0 +1,163 @@
+# src/utils/ratelimit.py
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for one provider credential.
+
+    Requests are held back until a concurrency slot, a request token and enough
+    character tokens are available. Throttling responses shrink the limits
+    multiplicatively; successful calls grow them back additively (AIMD) up to
+    the configured maximums. clock is the time source, in seconds.
+    """
+
+    def __init__(self, requests_per_second: float, characters_per_second: float,
+                 max_concurrency: int, min_concurrency: int = 1, clock: Callable[[], float] = time.monotonic):
+        self.max_requests_per_second = requests_per_second
+        self.max_characters_per_second = characters_per_second
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+
+        self.requests_per_second = requests_per_second
+        self.characters_per_second = characters_per_second
+        self.concurrency_limit = max_concurrency
+
+        self._request_tokens = requests_per_second
+        self._character_tokens = characters_per_second
+        self._clock = clock
+        self._refilled_at = clock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._successes = 0
+        self.throttle_events = 0
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        # The bucket holds at least one request, even when throttled below 1/s
+        self._request_tokens = min(max(1.0, self.requests_per_second),
+                                   self._request_tokens + elapsed * self.requests_per_second)
+        self._character_tokens = min(self.characters_per_second,
+                                     self._character_tokens + elapsed * self.characters_per_second)
+
+    def _try_acquire(self, characters: int) -> float:
+        self._refill()
+        # A request larger than one second's budget waits for a full
+        # bucket and then goes into debt instead of waiting forever
+        needed_chars = min(characters, self.characters_per_second)
+        if (self._in_flight < self.concurrency_limit
+                and self._request_tokens >= 1
+                and self._character_tokens >= needed_chars):
+            self._request_tokens -= 1
+            self._character_tokens -= characters
+            self._in_flight += 1
+            return 0.0
+        return max((1 - self._request_tokens) / self.requests_per_second,
+                   (needed_chars - self._character_tokens) / self.characters_per_second,
+                   0.001)
+
+    def try_acquire(self, characters: int = 0) -> float:
+        """
+        Take a slot for a request of the given size if it may be sent now.
+        Returns 0.0 when the slot was taken, else the seconds to wait before
+        trying again (a release() can free a slot sooner).
+        """
+        with self._cond:
+            return self._try_acquire(characters)
+
+    def acquire(self, characters: int = 0):
+        """Block until a request of the given size may be sent"""
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    wait = self._try_acquire(characters)
+                    if not wait:
+                        return
+                    self._cond.wait(timeout=wait)
+            finally:
+                self._waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, characters: int = 0):
+        """Context manager holding a slot for the duration of one request"""
+        self.acquire(characters)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_throttle(self):
+        """Multiplicative decrease after a 429 or quota response"""
+        with self._cond:
+            self.throttle_events += 1
+            self._successes = 0
+            self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit // 2)
+            self.requests_per_second = max(self.max_requests_per_second / 16, self.requests_per_second / 2)
+            self.characters_per_second = max(self.max_characters_per_second / 16, self.characters_per_second / 2)
+            self._request_tokens = min(self._request_tokens, max(1.0, self.requests_per_second))
+            self._character_tokens = min(self._character_tokens, self.characters_per_second)
+
+    def on_success(self):
+        """Additive increase: widen the limits after a full window of successes"""
+        with self._cond:
+            self._successes += 1
+            if self._successes < self.concurrency_limit:
+                return
+            self._successes = 0
+            self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1)
+            self.requests_per_second = min(self.max_requests_per_second,
+                                           self.requests_per_second + self.max_requests_per_second / 10)
+            self.characters_per_second = min(self.max_characters_per_second,
+                                             self.characters_per_second + self.max_characters_per_second / 10)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """Current limits and saturation"""
+        with self._cond:
+            return {
+                "requests_per_second": self.requests_per_second,
+                "characters_per_second": self.characters_per_second,
+                "concurrency_limit": self.concurrency_limit,
+                "in_flight": self._in_flight,
+                "queue_depth": self._waiting,
+                "throttle_events": self.throttle_events,
+            }
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, credential: str, requests_per_second: float,
+                     characters_per_second: float, max_concurrency: int) -> RateLimiter:
+    """
+    Shared limiter for a (provider, credential) pair.
+    The limits given by the first caller are used for the lifetime of the process.
+    """
+    key = (provider, credential)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(requests_per_second, characters_per_second, max_concurrency)
+            _limiters[key] = limiter
+        return limiter
+
+
+def rate_limiter_stats(provider: Optional[str] = None) -> Dict[Tuple[str, str], Dict[str, float]]:
+    """Snapshot of every limiter, optionally for one provider only"""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {key: limiter.stats() for key, limiter in limiters.items()
+            if provider is None or key[0] == provider}
@@ -0,0 +1,194 @@
+# src/utils/segmenter.py
+import contextvars
+import io
+import re
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from utils.errors import TranslationError
+from utils.memory import normalize_text
+
+# Sentence end: Latin punctuation followed by whitespace (so "3.14" stays whole),
+# or CJK full-width punctuation, which needs no space after it
+_SENTENCE_END = re.compile(r'(?:[.!?…]+["\'”’)\]]*(?=\s|$)|[。！？]+[」』”’）]*)(\s*)')
+
+
+def _split_sentences(line: str) -> Iterator[Tuple[str, str]]:
+    content = line.strip()
+    if not content:
+        yield "", line
+        return
+    pos = len(line) - len(line.lstrip())
+    if pos:
+        yield "", line[:pos]
+    for match in _SENTENCE_END.finditer(line, pos):
+        if match.end() == pos:
+            continue
+        yield line[pos:match.start(1)], match.group(1)
+        pos = match.end()
+    rest = line[pos:]
+    if rest:
+        body = rest.rstrip()
+        yield body, rest[len(body):]
+
+
+def _iter_paragraphs(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    paragraph: List[str] = []
+    separator: List[str] = []
+    for line in lines:
+        if line.strip():
+            if separator:
+                text = "".join(paragraph)
+                body = text.rstrip()
+                yield body, text[len(body):] + "".join(separator)
+                paragraph, separator = [], []
+            paragraph.append(line)
+        else:
+            separator.append(line)
+    text = "".join(paragraph)
+    body = text.rstrip()
+    if body or separator or text:
+        yield body, text[len(body):] + "".join(separator)
+
+
+def iter_segments(source: Union[str, Iterable[str]], mode: str = "sentence") -> Iterator[Tuple[str, str]]:
+    """
+    Split text into (segment, separator) pairs, streaming.
+    source is a string or any iterable of lines (e.g. an open file), which is
+    read one line at a time. mode is "sentence" (sentences within each line;
+    headers and table rows are their own segments) or "paragraph" (blocks
+    separated by blank lines). Concatenating every segment and separator
+    reproduces the input exactly; whitespace-only runs come back as
+    ("", whitespace).
+    """
+    lines = io.StringIO(source) if isinstance(source, str) else source
+    if mode == "paragraph":
+        yield from _iter_paragraphs(lines)
+    elif mode == "sentence":
+        for line in lines:
+            yield from _split_sentences(line)
+    else:
+        raise ValueError(f"Unsupported segmentation mode: {mode}")
+
+
+class SegmentPlan:
+    """
+    A segmented document with identical segments collapsed.
+
+    Only unique_segments (one copy of each distinct normalized segment) are
+    sent to a provider; assemble() fans the translations back out to every
+    position, in order, without building a second copy of the document.
+    """
+
+    def __init__(self, source: Union[str, Iterable[str]], mode: str = "sentence"):
+        self.unique_segments: List[str] = []
+        # (index into unique_segments, or -1 for whitespace only, separator) per position
+        self._positions: List[Tuple[int, str]] = []
+        self.total_characters = 0
+        self.unique_characters = 0
+        index_by_key = {}
+        for segment, separator in iter_segments(source, mode):
+            if not segment:
+                self._positions.append((-1, separator))
+                continue
+            self.total_characters += len(segment)
+            key = normalize_text(segment)
+            index = index_by_key.get(key)
+            if index is None:
+                index = len(self.unique_segments)
+                index_by_key[key] = index
+                self.unique_segments.append(segment)
+                self.unique_characters += len(segment)
+            self._positions.append((index, separator))
+
+    @property
+    def total_segments(self) -> int:
+        return sum(1 for index, _ in self._positions if index >= 0)
+
+    def assemble(self, translations: List[Optional[str]]) -> Iterator[str]:
+        """
+        Yield the translated document piece by piece.
+        translations is aligned with unique_segments; a None entry (e.g. a
+        failed segment) keeps the source segment in place. If translations
+        covers only the first unique segments (a translation in progress),
+        the document is rebuilt up to the first segment not translated yet.
+        """
+        for index, separator in self._positions:
+            if index >= len(translations):
+                return
+            if index >= 0:
+                translated = translations[index]
+                yield self.unique_segments[index] if translated is None else translated
+            yield separator
+
+
+def most_common_language(results: Iterable) -> Optional[str]:
+    """Most frequent detected language among (text, detected_lang, note) results"""
+    languages = Counter(result[1] for result in results if isinstance(result, tuple) and result[1])
+    return languages.most_common(1)[0][0] if languages else None
+
+
+def most_common_provider(providers: Iterable[Optional[str]]) -> Optional[str]:
+    """Provider that produced most of the results (None entries are failures or unknown)"""
+    counts = Counter(provider for provider in providers if provider)
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def _translate_batch(translator, texts: List[str], target_lang: str, source_lang: str) -> Tuple[List, List]:
+    """translate_batch results and the provider of each; None where the translator does not say"""
+    if hasattr(translator, "translate_batch_with_provider"):
+        return translator.translate_batch_with_provider(texts, target_lang, source_lang)
+    return translator.translate_batch(texts, target_lang, source_lang), [None] * len(texts)
+
+
+def translate_document(translator, source: Union[str, Iterable[str]], target_lang: str,
+                       source_lang: str = "auto", mode: str = "sentence") -> Tuple[SegmentPlan, List, List]:
+    """
+    Segment source, translate each distinct segment once with
+    translator.translate_batch and return (plan, results, providers).
+    results is aligned with plan.unique_segments and holds
+    (text, detected_lang, note) tuples or TranslationError instances; pass
+    the texts to plan.assemble() to rebuild the document. providers holds the
+    name of the provider that translated each segment, when the translator
+    reports it (see ResilientTranslator.translate_batch_with_provider).
+    """
+    plan = SegmentPlan(source, mode)
+    if not plan.unique_segments:
+        return plan, [], []
+    results, providers = _translate_batch(translator, plan.unique_segments, target_lang, source_lang)
+    return plan, results, providers
+
+
+def iter_translated_batches(translator, segments: List[str], target_lang: str, source_lang: str = "auto",
+                            max_batch: int = 32, max_workers: int = 4) -> Iterator[Tuple[List, List]]:
+    """
+    Translate segments with translator.translate_batch and yield
+    (results, providers) batch by batch, in order, as translate_document
+    returns them. Batches start at one segment and double up to max_batch, so
+    the first result arrives after about one segment's latency while later
+    requests stay full; up to max_workers batches are in flight.
+    Closing the generator (e.g. the editor cancelled) cancels batches not
+    started yet; results already yielded are unaffected.
+    """
+    def run(batch: List[str]) -> Tuple[List, List]:
+        try:
+            return _translate_batch(translator, batch, target_lang, source_lang)
+        except TranslationError as e:
+            return [e] * len(batch), [None] * len(batch)
+        except Exception as e:
+            return [TranslationError(f"Batch translation failed: {str(e)}")] * len(batch), [None] * len(batch)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="segment-batch")
+    try:
+        pending = deque()
+        start, size = 0, 1
+        while start < len(segments) or pending:
+            while start < len(segments) and len(pending) < max_workers:
+                batch = segments[start:start + size]
+                pending.append(executor.submit(contextvars.copy_context().run, run, batch))
+                start += len(batch)
+                size = min(size * 2, max_batch)
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
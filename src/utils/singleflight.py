@@ -0,0 +1,85 @@
+# src/utils/singleflight.py
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlightTimeout(Exception):
+    """Raised to a waiter whose in-flight call did not finish within the timeout"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Duplicate call suppression.
+
+    The first caller for a key (the leader) does the work; callers arriving
+    with the same key while it is in flight wait for the leader's result
+    instead of repeating the work. Nothing is cached: once the call finishes
+    the next caller for the key starts a new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def claim(self, key: Hashable) -> Tuple[_Call, bool]:
+        """Join the call in flight for key, or start one; returns (call, is_leader)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self.leaders += 1
+            return call, True
+
+    def resolve(self, key: Hashable, call: _Call, result: Any = None, error: Optional[BaseException] = None):
+        """Publish the leader's outcome to the waiters and retire the key"""
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def wait(self, call: _Call, timeout: Optional[float] = None) -> Any:
+        """The leader's result; re-raises its error, SingleFlightTimeout after timeout seconds"""
+        if not call.done.wait(timeout):
+            raise SingleFlightTimeout(f"in-flight call did not finish within {timeout}s")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Run fn once per key in flight.
+        Returns (result, shared): shared is True when the result came from
+        another caller's call.
+        """
+        call, leader = self.claim(key)
+        if not leader:
+            return self.wait(call, timeout), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.resolve(key, call, error=e)
+            raise
+        self.resolve(key, call, result=result)
+        return result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
@@ -1,15 +1,63 @@
 # src/utils/translation.py
 from abc import ABC, abstractmethod
+import asyncio
+import contextvars
 import deepl
 from google.cloud import translate_v2 as translate
-# from azure.ai.translation.text import TextTranslationClient, TranslatorCredential
-# from azure.core.exceptions import ServiceRequestError, ClientAuthenticationError
+from google.api_core import exceptions as google_exceptions
+import hashlib
 import os
-import requests # For Microsoft Translator language list
-from typing import Tuple, List, Dict, Optional
+import threading
+import time
+import requests # Microsoft Translator and mock server REST calls
+from requests.adapters import HTTPAdapter
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Tuple, List, Dict, Optional, Union, Iterator, Callable
+from utils.errors import TranslationError, TransientTranslationError, RateLimitError
+from utils.memory import TranslationMemory, get_default_memory, text_hash
+from utils.packer import RequestLimits, pack_requests, split_oversized
+from utils.fuzzy import FuzzyIndex
+from utils.languages import get_language_cache, match_language_code
+from utils.langdetect import detect_language
+from utils.metering import UsageMeter, get_default_meter, set_current_project
+from utils.ratelimit import RateLimiter, get_rate_limiter
+from utils.resilience import CircuitBreaker, get_circuit_breaker, backoff_delay
+from utils.singleflight import SingleFlight, SingleFlightTimeout
+
+# set_current_project and get_default_memory are re-exported for the pages, which import
+# this module as src.utils.translation: importing src.utils.metering or src.utils.memory
+# there would load second copies holding a different current project and memory
+__all__ = [
+    "TranslationProvider", "DeepLTranslator", "GoogleTranslator", "MockTranslator", "MicrosoftTranslator",
+    "DelegatingTranslator", "MemoryTranslator", "CoalescingTranslator", "ResilientTranslator",
+    "TranslationError", "TransientTranslationError", "RateLimitError",
+    "create_translator", "create_translator_chain", "compare_translations", "invalidate_translator",
+    "set_current_project", "get_default_memory",
+]
 
 class TranslationProvider(ABC):
     """Abstract base class for translation providers"""
+
+    # Name used for usage accounting
+    provider_name = "Unknown"
+
+    # Upper bound on requests in flight to this provider from the async API
+    max_concurrency = 8
+
+    # Size limits of one list request; None for providers without a list endpoint
+    request_limits: Optional[RequestLimits] = None
+
+    # Offline detections at or above this confidence need no remote detection call
+    local_detection_threshold = 0.8
+
+    # Shared per-credential limiter applied to every API call (None: unlimited)
+    rate_limiter: Optional[RateLimiter] = None
+    # Usage accounting of billed calls (None: not metered)
+    usage_meter: Optional[UsageMeter] = None
+    # Retries of a throttled call, with exponential backoff, before giving up
+    max_throttle_retries = 3
+    throttle_backoff = 1.0  # seconds
     
     @abstractmethod
     def get_source_languages(self) -> Dict[str, str]:
@@ -34,58 +82,434 @@ class TranslationProvider(ABC):
         """Get alternative translations"""
         pass
 
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        source_lang: str = "auto") -> List[Union[Tuple[str, str, str], "TranslationError"]]:
+        """
+        Translate a list of texts
+        Returns a list aligned with texts; each entry is either a
+        (translated_text, detected_language, alternatives_note) tuple or the
+        TranslationError raised for that item.
+        Providers with a native list endpoint override this.
+        """
+        results = []
+        for text in texts:
+            try:
+                results.append(self.translate(text, target_lang, source_lang))
+            except TranslationError as e:
+                results.append(e)
+        return results
+
+    async def translate_async(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        """
+        Async counterpart of translate.
+        The SDK call runs on the provider's worker pool, so any number of
+        coroutines can await translations while at most max_concurrency
+        requests are in flight.
+        """
+        loop = asyncio.get_running_loop()
+        # Worker threads run in a copy of the caller's context (e.g. its metering project)
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._async_executor(), context.run,
+                                          self.translate, text, target_lang, source_lang)
+
+    async def translate_batch_async(self, texts: List[str], target_lang: str,
+                                    source_lang: str = "auto") -> List[Union[Tuple[str, str, str], "TranslationError"]]:
+        """
+        Async counterpart of translate_batch.
+        texts are packed into request-sized groups that are sent concurrently;
+        results come back in input order.
+        """
+        loop = asyncio.get_running_loop()
+        if self.request_limits is None:
+            groups = [[text] for text in texts]
+        else:
+            groups = [[text for _, text in request]
+                      for request in pack_requests(enumerate(texts), self.request_limits)]
+        group_results = await asyncio.gather(*(
+            loop.run_in_executor(self._async_executor(), contextvars.copy_context().run,
+                                 self.translate_batch, group, target_lang, source_lang)
+            for group in groups
+        ))
+        return [result for group in group_results for result in group]
+
+    def detect_language(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Detect the language of text, as one of this provider's source codes.
+        The bundled offline detector answers first; only texts it is unsure
+        about fall back to the provider's remote detection.
+        Returns: (language_code or None, confidence)
+        """
+        local = self._detect_locally(text)
+        if local[0] is not None:
+            return local
+        return self._detect_remote(text)
+
+    def _detect_locally(self, text: str) -> Tuple[Optional[str], float]:
+        """Offline detection mapped to this provider's codes; (None, 0.0) if not confident"""
+        code, confidence = detect_language(text)
+        if code is None or confidence < self.local_detection_threshold:
+            return None, 0.0
+        mapped = match_language_code(code, self.get_source_languages())
+        return (mapped, confidence) if mapped else (None, 0.0)
+
+    def _detect_remote(self, text: str) -> Tuple[Optional[str], float]:
+        """Remote detection; providers without a detect endpoint return (None, 0.0)"""
+        return None, 0.0
+
+    def _async_executor(self) -> ThreadPoolExecutor:
+        """Worker pool bounding this provider's concurrency across all event loops"""
+        executor = self.__dict__.get("_executor")
+        if executor is None:
+            with _executor_lock:
+                executor = self.__dict__.get("_executor")
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                  thread_name_prefix=type(self).__name__)
+                    self.__dict__["_executor"] = executor
+        return executor
+
+    def close(self):
+        """Release network resources held by the provider client"""
+        executor = self.__dict__.pop("_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _is_throttling_error(self, error: Exception) -> bool:
+        """Whether an SDK exception means the provider is throttling us"""
+        return False
+
+    def _is_transient_error(self, error: Exception) -> bool:
+        """Whether an SDK exception is worth retrying (network trouble, 5xx)"""
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def _call_api(self, name: str, fn: Callable, *args, characters: int = 0, segments: int = 1, **kwargs):
+        """
+        Invoke a provider SDK method, counting the call in self.api_calls.
+        The call waits for the provider's rate limiter. Throttling responses
+        tighten the limiter, and they and other transient failures (network
+        trouble, 5xx) are retried with backoff, unless a ResilientTranslator
+        with another provider to fail over to is driving the call. Once the
+        retries are used up they raise RateLimitError or
+        TransientTranslationError so callers can fail over.
+        Successful calls that bill characters are recorded in self.usage_meter.
+        """
+        limiter = self.rate_limiter
+        # Under a ResilientTranslator with a fallback, the failover layer owns retries
+        retries = self.max_throttle_retries if _inner_retries.get() else 0
+        for attempt in range(retries + 1):
+            try:
+                if limiter is None:
+                    with _api_calls_lock:
+                        self.api_calls[name] += 1
+                    started = time.monotonic()
+                    result = fn(*args, **kwargs)
+                else:
+                    with limiter.slot(characters):
+                        with _api_calls_lock:
+                            self.api_calls[name] += 1
+                        started = time.monotonic()
+                        result = fn(*args, **kwargs)
+                    limiter.on_success()
+                if characters and self.usage_meter is not None:
+                    self.usage_meter.record(self.provider_name, characters, segments,
+                                            latency=time.monotonic() - started, operation=name)
+                return result
+            except Exception as e:
+                throttled = self._is_throttling_error(e)
+                if not throttled and not self._is_transient_error(e):
+                    raise
+                if throttled and limiter is not None:
+                    limiter.on_throttle()
+                if attempt == retries:
+                    if throttled:
+                        raise RateLimitError(f"{type(self).__name__}: rate limited by provider: {str(e)}") from e
+                    raise TransientTranslationError(f"{type(self).__name__}: {str(e)}") from e
+                time.sleep(self.throttle_backoff * 2 ** attempt if throttled else backoff_delay(attempt))
+
+    def _translate_in_chunks(self, texts: List[str], source_lang: str,
+                             translate_chunk: Callable[[List[str]], List[Union[Tuple[str, str, str], "TranslationError"]]],
+                             limits: Optional[RequestLimits] = None,
+                             join: Optional[Callable[[List[Tuple[str, str, str]], List], object]] = None
+                             ) -> List[Union[Tuple[str, str, str], "TranslationError"]]:
+        """
+        Helper for list endpoints: packs texts into as few requests as
+        limits (default self.request_limits) allow and reassembles the results
+        in input order. Texts too large for one request are split between
+        sentences, sent as several pieces and put back together with join
+        (default: _join_pieces). Blank items are answered locally; a failed
+        request fails only the items it carried.
+        """
+        limits = limits or self.request_limits
+        join = join or _join_pieces
+        results: List[Union[Tuple[str, str, str], TranslationError, None]] = [None] * len(texts)
+        split_items: Dict[int, List[Tuple[str, str, str]]] = {}
+        pieces = []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = (text, source_lang, "")
+            elif limits.fits(text):
+                pieces.append(((i, None), text))
+            else:
+                split_items[i] = split_oversized(text, limits)
+                pieces.extend(((i, j), body) for j, (_, body, _) in enumerate(split_items[i]))
+
+        piece_results = {}
+        for request in pack_requests(pieces, limits):
+            keys = [key for key, _ in request]
+            try:
+                request_results = translate_chunk([text for _, text in request])
+            except TranslationError as e:
+                request_results = [e] * len(keys)
+            except Exception as e:
+                request_results = [TranslationError(f"Batch translation failed: {str(e)}")] * len(keys)
+            for (i, j), result in zip(keys, request_results):
+                if j is None:
+                    results[i] = result
+                else:
+                    piece_results[(i, j)] = result
+
+        for i, parts in split_items.items():
+            part_results = [piece_results[(i, j)] for j in range(len(parts))]
+            error = next((result for result in part_results if isinstance(result, TranslationError)), None)
+            results[i] = error if error is not None else join(parts, part_results)
+        return results
+
+    def _translate_oversized(self, text: str, target_lang: str, source_lang: str) -> Tuple[str, str, str]:
+        """translate() for a text over the request limits: sent in pieces via translate_batch"""
+        result = self.translate_batch([text], target_lang, source_lang)[0]
+        if isinstance(result, TranslationError):
+            raise result
+        return result
+
+_executor_lock = threading.Lock()
+# Guards the api_calls counters: Counter += is a read-modify-write, and providers are shared across threads
+_api_calls_lock = threading.Lock()
+
+# False while ResilientTranslator drives a provider: retries happen in exactly one layer
+_inner_retries: contextvars.ContextVar[bool] = contextvars.ContextVar("inner_retries", default=True)
+
+# _call_api retries network errors and 5xx for every DeepLTranslator (or leaves them to
+# ResilientTranslator); the SDK's own retries would multiply those
+deepl.http_client.max_network_retries = 0
+
+# Connections kept alive per host in each shared client's HTTP pool
+HTTP_POOL_SIZE = 32
+
+def _widen_connection_pool(session: Optional[requests.Session], pool_size: int = HTTP_POOL_SIZE):
+    """
+    Give a client's requests session a keep-alive pool large enough for
+    concurrent editor sessions sharing it (requests defaults to 10).
+    """
+    if session is None:
+        return
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+def _join_pieces(parts: List[Tuple[str, str, str]], part_results: List[Tuple[str, str, str]]) -> Tuple[str, str, str]:
+    """Rebuild one result from the translated (prefix, body, suffix) pieces of a split text"""
+    translated = "".join(prefix + result[0] + suffix for (prefix, _, suffix), result in zip(parts, part_results))
+    return translated, part_results[0][1], part_results[0][2]
+
+def _alternatives_note(alternatives: List[str]) -> str:
+    """The alternatives_note of a translate() result"""
+    if not alternatives:
+        return ""
+    return "Alternative translations:\n" + "\n".join(f"• {alt}" for alt in alternatives)
+
+def _credential_fingerprint(credential: Optional[str]) -> str:
+    """Identify a credential in shared registries without keeping the secret itself"""
+    return hashlib.sha256((credential or "").encode("utf-8")).hexdigest()[:16]
+
 class DeepLTranslator(TranslationProvider):
-    def __init__(self, auth_key: str):
+    provider_name = "DeepL"
+    # DeepL accepts up to 50 texts and 128 KiB of request body per call
+    request_limits = RequestLimits(max_segments=50, max_bytes=128 * 1024)
+    rate_limits = {"requests_per_second": 10, "characters_per_second": 50_000}
+    # Requests that render the same text differently; formality variants are
+    # only sent for target languages that support formality
+    alternative_variants = [
+        {"formality": "prefer_more"},
+        {"formality": "prefer_less"},
+        {"model_type": "prefer_quality_optimized"},
+    ]
+
+    def __init__(self, auth_key: str, alternatives: bool = False):
+        """
+        alternatives: when True, translate() also fetches alternative
+        translations for the note, at the cost of extra API calls.
+        """
         self.translator = deepl.Translator(auth_key)
+        _widen_connection_pool(getattr(getattr(self.translator, "_client", None), "_session", None))
+        self.alternatives = alternatives
+        self.api_calls: Counter = Counter()
+        self.language_cache = get_language_cache()
+        self.rate_limiter = get_rate_limiter("DeepL", _credential_fingerprint(auth_key),
+                                             max_concurrency=self.max_concurrency, **self.rate_limits)
+        self.usage_meter = get_default_meter()
+
+    def _is_throttling_error(self, error: Exception) -> bool:
+        return isinstance(error, deepl.TooManyRequestsException)
+
+    def _is_transient_error(self, error: Exception) -> bool:
+        if isinstance(error, deepl.ConnectionException):
+            return True
+        status = getattr(error, "http_status_code", None)
+        return status is not None and status >= 500 or super()._is_transient_error(error)
 
     def get_source_languages(self) -> Dict[str, str]:
-        return {lang.code: lang.name for lang in self.translator.get_source_languages()}
+        def fetch():
+            languages = self._call_api("get_source_languages", self.translator.get_source_languages)
+            return {lang.code: lang.name for lang in languages}
+        return self.language_cache.get("DeepL:source", fetch)
 
     def get_target_languages(self) -> Dict[str, str]:
-        return {lang.code: lang.name for lang in self.translator.get_target_languages()}
+        def fetch():
+            languages = self._call_api("get_target_languages", self.translator.get_target_languages)
+            return {lang.code: lang.name for lang in languages}
+        return self.language_cache.get("DeepL:target", fetch)
 
-    def get_alternatives(self, text: str, target_lang: str, num_alternatives: int = 3) -> List[str]:
+    def close(self):
+        super().close()
+        self.translator.close()
+
+    def _supports_formality(self, target_lang: str) -> bool:
+        def fetch():
+            languages = self._call_api("get_target_languages", self.translator.get_target_languages)
+            return {lang.code: lang.name for lang in languages if lang.supports_formality}
         try:
-            alternatives = []
-            for _ in range(num_alternatives):
-                result = self.translator.translate_text(
-                    text,
-                    target_lang=target_lang,
-                    formality="default"
-                )
-                if result.text not in alternatives:
-                    alternatives.append(result.text)
-            return alternatives
-        except:
+            return target_lang.upper() in self.language_cache.get("DeepL:formality", fetch)
+        except Exception:
+            return False
+
+    def _alternative_requests(self, target_lang: str, num_alternatives: int,
+                              context: Optional[str] = None) -> List[Dict[str, str]]:
+        """Request options for up to num_alternatives genuinely different renderings"""
+        variants = [options for options in self.alternative_variants
+                    if "formality" not in options or self._supports_formality(target_lang)]
+        if context:
+            # DeepL does not bill context characters
+            variants.insert(0, {"context": context})
+        return variants[:num_alternatives]
+
+    def _translate_variants(self, text: str, target_lang: str, source_lang: str,
+                            variants: List[Dict[str, str]]) -> List[Union[deepl.TextResult, Exception]]:
+        """Translate text once per request variant, concurrently; failures are returned in place"""
+        def run(options: Dict[str, str]) -> deepl.TextResult:
+            return self._call_api(
+                "translate_text",
+                self.translator.translate_text,
+                text,
+                target_lang=target_lang,
+                source_lang=None if source_lang == "auto" else source_lang,
+                characters=len(text),
+                **options
+            )
+
+        if len(variants) == 1:
+            try:
+                return [run(variants[0])]
+            except Exception as e:
+                return [e]
+        with ThreadPoolExecutor(max_workers=len(variants)) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, run, options) for options in variants]
+        outputs = []
+        for future in futures:
+            try:
+                outputs.append(future.result())
+            except Exception as e:
+                outputs.append(e)
+        return outputs
+
+    def get_alternatives(self, text: str, target_lang: str, num_alternatives: int = 3,
+                         source_lang: str = "auto", context: Optional[str] = None) -> List[str]:
+        """
+        Alternative translations from differently configured requests
+        (formal, informal, quality-optimized model, optional context), sent
+        concurrently. Raises TranslationError only if every request failed.
+        """
+        variants = self._alternative_requests(target_lang, num_alternatives, context)
+        if not variants:
             return []
+        alternatives, errors = [], []
+        for output in self._translate_variants(text, target_lang, source_lang, variants):
+            if isinstance(output, Exception):
+                errors.append(output)
+            elif output.text not in alternatives:
+                alternatives.append(output.text)
+        if errors and not alternatives:
+            raise TranslationError(f"DeepL: Alternative translations failed: {str(errors[0])}")
+        return alternatives
 
     def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        if not self.request_limits.fits(text):
+            return self._translate_oversized(text, target_lang, source_lang)
+        (translated_text, detected_lang, _), alternatives = self.translate_with_alternatives(
+            text, target_lang, source_lang)
+        return translated_text, detected_lang, _alternatives_note(alternatives)
+
+    def translate_with_alternatives(self, text: str, target_lang: str,
+                                    source_lang: str = "auto") -> Tuple[Tuple[str, str, str], List[str]]:
+        """
+        translate() returning the alternatives as a list instead of in the note
+        Returns: ((translated_text, detected_language, ""), alternatives); alternatives
+        is empty unless self.alternatives is set.
+        """
         try:
+            # A single request both detects the source language and translates;
+            # alternatives, when enabled, are requested alongside it
+            variants = [{}]
+            if self.alternatives:
+                variants += self._alternative_requests(target_lang, 3)
+            outputs = self._translate_variants(text, target_lang, source_lang, variants)
+            translation_result = outputs[0]
+            if isinstance(translation_result, Exception):
+                raise translation_result
             if source_lang == "auto":
-                source_lang_result = self.translator.translate_text(text, target_lang="EN-US")
-                detected_lang = source_lang_result.detected_source_lang
+                detected_lang = translation_result.detected_source_lang
             else:
                 detected_lang = source_lang
-            
-            translation_result = self.translator.translate_text(
-                text, 
-                target_lang=target_lang,
-                source_lang=detected_lang
-            )
-            
-            alternatives = self.get_alternatives(text, target_lang)
-            alternatives = [alt for alt in alternatives if alt != translation_result.text]
-            
-            alt_text = ""
-            if alternatives:
-                alt_text = "Alternative translations:\n" + "\n".join(f"• {alt}" for alt in alternatives)
-            
-            return translation_result.text, detected_lang, alt_text
-            
+
+            alternatives = []
+            for output in outputs[1:]:
+                if not isinstance(output, Exception) and output.text != translation_result.text \
+                        and output.text not in alternatives:
+                    alternatives.append(output.text)
+
+            return (translation_result.text, detected_lang, ""), alternatives
+
+        except TranslationError:
+            raise
         except Exception as e:
             raise TranslationError(f"Translation failed: {str(e)}")
 
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        source_lang: str = "auto") -> List[Union[Tuple[str, str, str], "TranslationError"]]:
+        def translate_chunk(chunk: List[str]) -> List[Tuple[str, str, str]]:
+            results = self._call_api(
+                "translate_text",
+                self.translator.translate_text,
+                chunk,
+                target_lang=target_lang,
+                source_lang=None if source_lang == "auto" else source_lang,
+                characters=sum(len(text) for text in chunk),
+                segments=len(chunk)
+            )
+            return [
+                (r.text, r.detected_source_lang if source_lang == "auto" else source_lang, "")
+                for r in results
+            ]
+
+        return self._translate_in_chunks(texts, source_lang, translate_chunk)
+
 class GoogleTranslator(TranslationProvider):
+    provider_name = "Google Translate"
+    # Google Translate v2 accepts up to 128 segments per call; keep requests well under its size cap
+    request_limits = RequestLimits(max_segments=128, max_bytes=100 * 1024)
+    max_concurrency = 16
+    # Default Cloud Translation quota: 6M characters per minute per project
+    rate_limits = {"requests_per_second": 50, "characters_per_second": 100_000}
+
     def __init__(self, credentials_path: Optional[str] = None):
         """
         Initializes the Google Translator.
@@ -94,185 +518,1033 @@ class GoogleTranslator(TranslationProvider):
         """
         if credentials_path:
             os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
+        self.api_calls: Counter = Counter()
+        self.language_cache = get_language_cache()
+        self.rate_limiter = get_rate_limiter(
+            "Google Translate",
+            _credential_fingerprint(credentials_path or os.getenv("GOOGLE_APPLICATION_CREDENTIALS")),
+            max_concurrency=self.max_concurrency, **self.rate_limits
+        )
+        self.usage_meter = get_default_meter()
         try:
             self.client = translate.Client()
-            # Attempt a simple call to ensure credentials are valid
-            self.client.get_languages(target_language='en')
+            _widen_connection_pool(self.client._http)
+            # Loading the language list validates the credentials; once it is
+            # cached this costs no network call
+            self._get_languages()
         except Exception as e:
             raise TranslationError(f"Failed to initialize Google Translate client: {e}. Ensure GOOGLE_APPLICATION_CREDENTIALS is set correctly.")
 
+    def _get_languages(self) -> Dict[str, str]:
+        def fetch():
+            languages = self._call_api("get_languages", self.client.get_languages, target_language='en') # target_language for language names
+            return {lang['language']: lang['name'] for lang in languages}
+        return self.language_cache.get("Google Translate:languages", fetch)
+
+    def close(self):
+        super().close()
+        self.client._http.close()
+
+    def _is_throttling_error(self, error: Exception) -> bool:
+        if isinstance(error, google_exceptions.TooManyRequests):
+            return True
+        # Per-minute quota overruns come back as 403 with a rate limit reason
+        return (isinstance(error, google_exceptions.Forbidden)
+                and "ratelimitexceeded" in str(error).lower())
+
+    def _is_transient_error(self, error: Exception) -> bool:
+        return (isinstance(error, (google_exceptions.ServerError, google_exceptions.RetryError))
+                or super()._is_transient_error(error))
+
     def get_source_languages(self) -> Dict[str, str]:
         try:
-            languages = self.client.get_languages(target_language='en') # target_language for language names
-            return {lang['language']: lang['name'] for lang in languages}
+            return self._get_languages()
         except Exception as e:
             raise TranslationError(f"Google: Error fetching source languages: {str(e)}")
 
     def get_target_languages(self) -> Dict[str, str]:
         try:
-            languages = self.client.get_languages(target_language='en') # target_language for language names
             # Google Translate API v2 supports the same set for source and target
-            return {lang['language']: lang['name'] for lang in languages}
+            return self._get_languages()
         except Exception as e:
             raise TranslationError(f"Google: Error fetching target languages: {str(e)}")
 
+    def _detect_remote(self, text: str) -> Tuple[Optional[str], float]:
+        try:
+            result = self._call_api("detect_language", self.client.detect_language, [text],
+                                    characters=len(text))[0]
+        except TranslationError:
+            raise
+        except Exception as e:
+            raise TranslationError(f"Google: Language detection failed: {str(e)}")
+        # Google API might return 'und' for undefined if detection is poor
+        if result['language'] == 'und':
+            return None, 0.0
+        return result['language'], result.get('confidence', 0.0)
+
     def get_alternatives(self, text: str, target_lang: str, num_alternatives: int = 3) -> List[str]:
         # Google Translate API v2 (google-cloud-translate library) does not directly support alternatives.
         # Returning an empty list as per plan.
         return []
 
+    def _translate_values(self, values: List[str], target_lang: str, source_lang: str,
+                          alt_text: str = "") -> List[Union[Tuple[str, str, str], "TranslationError"]]:
+        """
+        Translate a list of texts in one request.
+        In auto mode no source_language is sent, so Google detects the language
+        as part of the translation and reports it as detectedSourceLanguage;
+        there is no separate detect_language round trip.
+        """
+        auto = source_lang == "auto" or not source_lang
+        results = self._call_api(
+            "translate",
+            self.client.translate,
+            values,
+            target_language=target_lang,
+            source_language=None if auto else source_lang,
+            characters=sum(len(value) for value in values),
+            segments=len(values)
+        )
+
+        translated = []
+        for r in results:
+            detected_lang = r.get('detectedSourceLanguage', 'und') if auto else source_lang
+            # Google API might return 'und' for undefined if detection is poor
+            if detected_lang == 'und':
+                translated.append(TranslationError("Google: Could not reliably detect source language."))
+            else:
+                translated.append((r['translatedText'], detected_lang, alt_text))
+        return translated
+
+    def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        if not self.request_limits.fits(text):
+            return self._translate_oversized(text, target_lang, source_lang)
+        try:
+            # Alternatives are not supported by this API version directly
+            result = self._translate_values(
+                [text], target_lang, source_lang,
+                alt_text="Alternative translations not supported by Google Translate API v2."
+            )[0]
+        except TranslationError:
+            raise
+        except Exception as e:
+            raise TranslationError(f"Google: Translation failed: {str(e)}")
+        if isinstance(result, TranslationError):
+            raise result
+        return result
+
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        source_lang: str = "auto") -> List[Union[Tuple[str, str, str], "TranslationError"]]:
+        auto = source_lang == "auto" or not source_lang
+
+        def translate_chunk(chunk: List[str]) -> List[Union[Tuple[str, str, str], TranslationError]]:
+            try:
+                return self._translate_values(chunk, target_lang, source_lang)
+            except TranslationError:
+                raise
+            except Exception as e:
+                raise TranslationError(f"Google: Batch translation failed: {str(e)}")
+
+        return self._translate_in_chunks(texts, "auto" if auto else source_lang, translate_chunk)
+
+class MockTranslator(TranslationProvider):
+    """
+    Adapter for the local mock server (utils/mock_server.py).
+    Speaks the DeepL (api="deepl") or Google v2 (api="google") request shape
+    over a pooled HTTP session, so batching, rate limiting and retries can be
+    exercised offline without billed calls.
+    """
+    provider_name = "Mock"
+    request_limits = RequestLimits(max_segments=50, max_bytes=128 * 1024)
+    rate_limits = {"requests_per_second": 50, "characters_per_second": 500_000}
+
+    def __init__(self, server_url: str = "http://127.0.0.1:8765", api: str = "deepl", timeout: float = 10.0):
+        if api not in ("deepl", "google"):
+            raise TranslationError(f"Mock: unsupported API shape: {api}")
+        self.server_url = server_url.rstrip("/")
+        self.api = api
+        self.timeout = timeout
+        self.session = requests.Session()
+        _widen_connection_pool(self.session)
+        self.api_calls: Counter = Counter()
+        self.rate_limiter = get_rate_limiter("Mock", _credential_fingerprint(self.server_url),
+                                             max_concurrency=self.max_concurrency, **self.rate_limits)
+        self.usage_meter = get_default_meter()
+
+    def _request(self, method: str, path: str, **kwargs):
+        response = self.session.request(method, f"{self.server_url}{path}", timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def _is_throttling_error(self, error: Exception) -> bool:
+        return isinstance(error, requests.exceptions.HTTPError) and error.response.status_code == 429
+
+    def _is_transient_error(self, error: Exception) -> bool:
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response.status_code >= 500
+        return super()._is_transient_error(error)
+
+    def _get_languages(self, kind: str) -> Dict[str, str]:
+        try:
+            if self.api == "deepl":
+                languages = self._call_api("languages", self._request, "GET", "/v2/languages", params={"type": kind})
+                return {lang["language"]: lang["name"] for lang in languages}
+            languages = self._call_api("languages", self._request, "GET", "/language/translate/v2/languages")
+            return {lang["language"]: lang["name"] for lang in languages["data"]["languages"]}
+        except TranslationError:
+            raise
+        except Exception as e:
+            raise TranslationError(f"Mock: Error fetching languages: {str(e)}")
+
+    def get_source_languages(self) -> Dict[str, str]:
+        return self._get_languages("source")
+
+    def get_target_languages(self) -> Dict[str, str]:
+        return self._get_languages("target")
+
+    def get_alternatives(self, text: str, target_lang: str, num_alternatives: int = 3) -> List[str]:
+        return []
+
+    def _translate_values(self, values: List[str], target_lang: str, source_lang: str) -> List[Tuple[str, str, str]]:
+        auto = source_lang == "auto" or not source_lang
+        characters = sum(len(value) for value in values)
+        if self.api == "deepl":
+            payload = {"text": values, "target_lang": target_lang}
+            if not auto:
+                payload["source_lang"] = source_lang
+            response = self._call_api("translate", self._request, "POST", "/v2/translate", json=payload,
+                                      characters=characters, segments=len(values))
+            return [(t["text"], t["detected_source_language"] if auto else source_lang, "")
+                    for t in response["translations"]]
+        payload = {"q": values, "target": target_lang, "format": "text"}
+        if not auto:
+            payload["source"] = source_lang
+        response = self._call_api("translate", self._request, "POST", "/language/translate/v2", json=payload,
+                                  characters=characters, segments=len(values))
+        return [(t["translatedText"], t.get("detectedSourceLanguage", source_lang) if auto else source_lang, "")
+                for t in response["data"]["translations"]]
+
     def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        if not self.request_limits.fits(text):
+            return self._translate_oversized(text, target_lang, source_lang)
         try:
-            if source_lang == "auto" or not source_lang:
-                # Detect language first
-                detection_result = self.client.detect_language([text])
-                detected_lang = detection_result[0]['language']
-                # Google API might return 'und' for undefined if detection is poor
-                if detected_lang == 'und':
-                    raise TranslationError("Google: Could not reliably detect source language.")
+            return self._translate_values([text], target_lang, source_lang)[0]
+        except TranslationError:
+            raise
+        except Exception as e:
+            raise TranslationError(f"Mock: Translation failed: {str(e)}")
+
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        source_lang: str = "auto") -> List[Union[Tuple[str, str, str], "TranslationError"]]:
+        def translate_chunk(chunk: List[str]) -> List[Tuple[str, str, str]]:
+            try:
+                return self._translate_values(chunk, target_lang, source_lang)
+            except TranslationError:
+                raise
+            except Exception as e:
+                raise TranslationError(f"Mock: Batch translation failed: {str(e)}")
+
+        return self._translate_in_chunks(texts, source_lang, translate_chunk)
+
+    def close(self):
+        super().close()
+        self.session.close()
+
+class MicrosoftTranslator(TranslationProvider):
+    """
+    Microsoft Translator Text API v3 over a shared keep-alive session.
+    One request carries up to 100 texts and any number of target languages
+    (see translate_to_many); the language table is cached like the other
+    providers'. Point endpoint at utils/mock_server.py to test offline.
+    """
+    provider_name = "Microsoft Translator"
+    # v3 accepts up to 100 elements and 50,000 characters per request, counting
+    # the characters once per target language
+    request_limits = RequestLimits(max_segments=100, max_characters=50_000)
+    max_concurrency = 16
+    rate_limits = {"requests_per_second": 20, "characters_per_second": 10_000}
+    api_version = "3.0"
+
+    def __init__(self, api_key: str, region: str, endpoint: str = "https://api.cognitive.microsofttranslator.com/",
+                 timeout: float = 10.0):
+        """
+        Initializes the Microsoft Translator.
+        Requires API key and region. Endpoint is optional.
+        """
+        if not api_key:
+            raise TranslationError("Microsoft Translator: API key is required.")
+        if not region:
+            raise TranslationError("Microsoft Translator: Region is required.")
+
+        self.endpoint = endpoint.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Ocp-Apim-Subscription-Key': api_key,
+            'Ocp-Apim-Subscription-Region': region,
+            'Content-Type': 'application/json; charset=UTF-8',
+        })
+        _widen_connection_pool(self.session)
+        self.api_calls: Counter = Counter()
+        self.language_cache = get_language_cache()
+        self.rate_limiter = get_rate_limiter("Microsoft Translator", _credential_fingerprint(api_key),
+                                             max_concurrency=self.max_concurrency, **self.rate_limits)
+        self.usage_meter = get_default_meter()
+        try:
+            # Loading the language list checks the endpoint; once it is cached this costs no network call
+            self._get_ms_languages()
+        except TranslationError:
+            raise
+        except Exception as e:
+            raise TranslationError(f"Microsoft Translator: Failed to initialize client: {e}")
+
+    def _request(self, method: str, path: str, params: Optional[List[Tuple[str, str]]] = None, json=None):
+        response = self.session.request(method, f"{self.endpoint}/{path}",
+                                        params=[('api-version', self.api_version)] + (params or []),
+                                        json=json, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _is_throttling_error(self, error: Exception) -> bool:
+        return isinstance(error, requests.exceptions.HTTPError) and error.response.status_code == 429
+
+    def _is_transient_error(self, error: Exception) -> bool:
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response.status_code >= 500
+        return super()._is_transient_error(error)
+
+    def close(self):
+        super().close()
+        self.session.close()
+
+    def _get_ms_languages(self) -> Dict[str, str]:
+        """Language codes and English names from the /languages endpoint, cached"""
+        def fetch():
+            # The languages endpoint needs no authentication
+            response = self._call_api("languages", self._request, "GET", "languages",
+                                      params=[('scope', 'translation')])
+            # The response structure is like: {"translation": {"ar": {"name": "Arabic", "nativeName": "العربية", "dir": "rtl"}}}
+            return {code: data["name"] for code, data in response.get("translation", {}).items()}
+        try:
+            return self.language_cache.get("Microsoft Translator:languages", fetch)
+        except TranslationError:
+            raise
+        except Exception as e:
+            raise TranslationError(f"Microsoft Translator: Error fetching languages: {e}")
+
+    def get_source_languages(self) -> Dict[str, str]:
+        return self._get_ms_languages()
+
+    def get_target_languages(self) -> Dict[str, str]:
+        # For Microsoft Translator, source and target languages are generally the same.
+        return self._get_ms_languages()
+
+    def get_alternatives(self, text: str, target_lang: str, num_alternatives: int = 3) -> List[str]:
+        # The Translate method returns only one translation per target language
+        return []
+
+    def _detect_remote(self, text: str) -> Tuple[Optional[str], float]:
+        try:
+            result = self._call_api("detect", self._request, "POST", "detect", json=[{"Text": text}],
+                                    characters=len(text))[0]
+        except TranslationError:
+            raise
+        except Exception as e:
+            raise TranslationError(f"Microsoft Translator: Language detection failed: {str(e)}")
+        return result.get("language") or None, result.get("score", 0.0)
+
+    def _translate_values(self, values: List[str], target_langs: List[str],
+                          source_lang: str) -> List[Dict[str, Tuple[str, str, str]]]:
+        """
+        Translate a list of texts into every target language in one request.
+        Returns one {target_lang: (translated_text, detected_language, note)}
+        dict per text.
+        """
+        auto = source_lang == "auto" or not source_lang
+        params = [('to', target) for target in target_langs]
+        if not auto:
+            params.append(('from', source_lang))
+        response = self._call_api(
+            "translate",
+            self._request,
+            "POST",
+            "translate",
+            params=params,
+            json=[{"Text": value} for value in values],
+            # Billed once per target language
+            characters=sum(len(value) for value in values) * len(target_langs),
+            segments=len(values) * len(target_langs)
+        )
+        translated = []
+        for item in response:
+            detected_lang = item.get("detectedLanguage", {}).get("language", "und") if auto else source_lang
+            by_target = {}
+            # Targets come back in request order; match on position, as 'to' may be normalized
+            for target, translation in zip(target_langs, item["translations"]):
+                by_target[target] = (translation["text"], detected_lang, "")
+            translated.append(by_target)
+        return translated
+
+    def translate_to_many(self, texts: List[str], target_langs: List[str],
+                          source_lang: str = "auto") -> Dict[str, List[Union[Tuple[str, str, str], "TranslationError"]]]:
+        """
+        Translate texts into several target languages, with each request
+        carrying all the targets at once.
+        Returns {target_lang: results aligned with texts}, each result a
+        (translated_text, detected_language, note) tuple or a TranslationError.
+        """
+        if not target_langs:
+            return {}
+        # The character limit applies to the text times the number of targets
+        limits = RequestLimits(max_segments=self.request_limits.max_segments,
+                               max_characters=self.request_limits.max_characters // len(target_langs))
+
+        def translate_chunk(chunk: List[str]) -> List[Dict[str, Tuple[str, str, str]]]:
+            try:
+                return self._translate_values(chunk, target_langs, source_lang)
+            except TranslationError:
+                raise
+            except Exception as e:
+                raise TranslationError(f"Microsoft Translator: Translation failed: {str(e)}")
+
+        def join(parts, part_results) -> Dict[str, Tuple[str, str, str]]:
+            return {target: _join_pieces(parts, [result[target] for result in part_results])
+                    for target in target_langs}
+
+        auto = source_lang == "auto" or not source_lang
+        results = self._translate_in_chunks(texts, "auto" if auto else source_lang, translate_chunk, limits, join)
+        by_target: Dict[str, List] = {target: [] for target in target_langs}
+        for result in results:
+            for target in target_langs:
+                if isinstance(result, TranslationError) or isinstance(result, tuple):
+                    # Errors and locally answered blank items apply to every target
+                    by_target[target].append(result)
+                elif result[target][1] == 'und':
+                    by_target[target].append(TranslationError("Microsoft Translator: Could not reliably detect source language."))
+                else:
+                    by_target[target].append(result[target])
+        return by_target
+
+    def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        result = self.translate_to_many([text], [target_lang], source_lang)[target_lang][0]
+        if isinstance(result, TranslationError):
+            raise result
+        return result
+
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        source_lang: str = "auto") -> List[Union[Tuple[str, str, str], "TranslationError"]]:
+        return self.translate_to_many(texts, [target_lang], source_lang)[target_lang]
+
+
+class DelegatingTranslator(TranslationProvider):
+    """
+    Base of translators that wrap another one (self.translator): language
+    tables, request limits, concurrency, metering, alternatives and language
+    detection are those of the wrapped translator unless a subclass overrides them.
+    """
+
+    def __init__(self, translator: TranslationProvider):
+        self.translator = translator
+
+    def __getattr__(self, name):
+        # Expose provider specific attributes (e.g. the underlying SDK client)
+        return getattr(self.translator, name)
+
+    # Batching and concurrency follow the wrapped provider, not the base class defaults
+    @property
+    def request_limits(self) -> Optional[RequestLimits]:
+        return self.translator.request_limits
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.translator.max_concurrency
+
+    @property
+    def usage_meter(self) -> Optional[UsageMeter]:
+        return self.translator.usage_meter
+
+    def get_source_languages(self) -> Dict[str, str]:
+        return self.translator.get_source_languages()
+
+    def get_target_languages(self) -> Dict[str, str]:
+        return self.translator.get_target_languages()
+
+    def get_alternatives(self, text: str, target_lang: str, num_alternatives: int = 3, **options) -> List[str]:
+        return self.translator.get_alternatives(text, target_lang, num_alternatives, **options)
+
+    def detect_language(self, text: str) -> Tuple[Optional[str], float]:
+        return self.translator.detect_language(text)
+
+class MemoryTranslator(DelegatingTranslator):
+    """
+    Wraps a provider with an exact-match translation memory lookup.
+    With a fuzzy_index and auto_accept_score, batch translations also reuse
+    near matches scoring at least auto_accept_score instead of calling the provider.
+    """
+
+    def __init__(self, provider_name: str, translator: TranslationProvider,
+                 memory: Optional[TranslationMemory] = None,
+                 fuzzy_index: Optional[FuzzyIndex] = None, auto_accept_score: Optional[float] = None):
+        super().__init__(translator)
+        self.provider_name = provider_name
+        self.memory = memory or get_default_memory()
+        self.fuzzy_index = fuzzy_index
+        self.auto_accept_score = auto_accept_score
+
+    def _record_hits(self, texts: List[str]):
+        """Meter characters served from memory instead of the provider"""
+        meter = self.usage_meter
+        if meter is not None and texts:
+            meter.record(self.provider_name, sum(len(text) for text in texts), len(texts),
+                         cache_hit=True, operation="memory")
+
+    def get_alternatives(self, text: str, target_lang: str, num_alternatives: int = 3, **options) -> List[str]:
+        """
+        Alternatives are stored per source text hash, so a segment never pays
+        for them twice. Provider specific options (e.g. a DeepL context)
+        bypass the store.
+        """
+        if options or not text or not text.strip():
+            return self.translator.get_alternatives(text, target_lang, num_alternatives, **options)
+        cached = self.memory.get_alternatives(self.provider_name, text, target_lang)
+        if cached is not None:
+            return cached[:num_alternatives]
+        try:
+            alternatives = self.translator.get_alternatives(text, target_lang, num_alternatives)
+        except TranslationError:
+            # Not stored, so the next request tries again
+            return []
+        self.memory.put_alternatives(self.provider_name, text, target_lang, alternatives)
+        return alternatives
+
+    def _wants_alternatives(self) -> bool:
+        """Whether the wrapped provider adds alternatives to translate() results (DeepL option)"""
+        return bool(getattr(self.translator, "alternatives", False))
+
+    def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        if not text or not text.strip():
+            return self.translator.translate(text, target_lang, source_lang)
+
+        cached = self.memory.get(self.provider_name, text, target_lang, source_lang)
+        if cached is None and source_lang == "auto":
+            # The same text may have been stored under an explicit source language
+            detected_lang, _ = self.translator._detect_locally(text)
+            if detected_lang:
+                cached = self.memory.get(self.provider_name, text, target_lang, detected_lang)
+        if cached is not None:
+            self._record_hits([text])
+            if self._wants_alternatives():
+                # Alternatives live in their own store (see get_alternatives), not in the entry
+                translated_text, detected_lang, _ = cached
+                alternatives = [alternative for alternative in self.get_alternatives(text, target_lang)
+                                if alternative != translated_text]
+                return translated_text, detected_lang, _alternatives_note(alternatives)
+            return cached
+
+        if self._wants_alternatives() and hasattr(self.translator, "translate_with_alternatives"):
+            result, alternatives = self.translator.translate_with_alternatives(text, target_lang, source_lang)
+            self.memory.put_alternatives(self.provider_name, text, target_lang, alternatives)
+            self.memory.put(self.provider_name, text, target_lang, source_lang, result)
+            return result[:2] + (_alternatives_note(alternatives),)
+
+        result = self.translator.translate(text, target_lang, source_lang)
+        self.memory.put(self.provider_name, text, target_lang, source_lang, result)
+        return result
+
+    async def translate_async(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        if self._wants_alternatives():
+            # A hit may still need alternatives fetched; run translate() on the worker pool
+            return await super().translate_async(text, target_lang, source_lang)
+        if text and text.strip():
+            cached = self.memory.get(self.provider_name, text, target_lang, source_lang)
+            if cached is not None:
+                self._record_hits([text])
+                return cached
+        result = await self.translator.translate_async(text, target_lang, source_lang)
+        if text and text.strip():
+            self.memory.put(self.provider_name, text, target_lang, source_lang, result)
+        return result
+
+    def _lookup_batch(self, texts: List[str], target_lang: str, source_lang: str) -> List[Optional[Tuple[str, str, str]]]:
+        """Memory hits, then auto-accepted fuzzy matches; None where the provider is needed"""
+        results = []
+        for text in texts:
+            result = None
+            if text and text.strip():
+                result = self.memory.get(self.provider_name, text, target_lang, source_lang)
+                if result is None and self.fuzzy_index is not None and self.auto_accept_score is not None:
+                    match = self.fuzzy_index.best_match(text, target_lang, self.auto_accept_score)
+                    if match is not None:
+                        result = (match["target_text"], match["source_lang"],
+                                  f"Fuzzy match ({match['score']:.0%}) reused from translation #{match['id']}")
+            results.append(result)
+        self._record_hits([text for text, result in zip(texts, results) if result is not None])
+        return results
+
+    def _store_batch(self, texts: List[str], misses: List[int], fetched: List, results: List,
+                     target_lang: str, source_lang: str):
+        for i, result in zip(misses, fetched):
+            results[i] = result
+            if not isinstance(result, TranslationError) and texts[i].strip():
+                self.memory.put(self.provider_name, texts[i], target_lang, source_lang, result)
+
+    async def translate_batch_async(self, texts: List[str], target_lang: str,
+                                    source_lang: str = "auto") -> List[Union[Tuple[str, str, str], TranslationError]]:
+        results = self._lookup_batch(texts, target_lang, source_lang)
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            fetched = await self.translator.translate_batch_async([texts[i] for i in misses], target_lang, source_lang)
+            self._store_batch(texts, misses, fetched, results, target_lang, source_lang)
+        return results
+
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        source_lang: str = "auto") -> List[Union[Tuple[str, str, str], TranslationError]]:
+        results = self._lookup_batch(texts, target_lang, source_lang)
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            fetched = self.translator.translate_batch([texts[i] for i in misses], target_lang, source_lang)
+            self._store_batch(texts, misses, fetched, results, target_lang, source_lang)
+        return results
+
+# In-flight translate calls shared by every session in the process
+_translate_flights = SingleFlight()
+
+class CoalescingTranslator(DelegatingTranslator):
+    """
+    Wraps a translator so identical requests in flight at the same moment,
+    from any session in the process, share one provider call.
+
+    Requests are identified by flight_key (the provider and its
+    configuration), source and target language and the normalized text
+    hash. Callers that join an in-flight request wait at most timeout
+    seconds for it, then get a TransientTranslationError.
+    """
+
+    def __init__(self, flight_key: Tuple, translator: TranslationProvider,
+                 timeout: float = 30.0, flights: Optional[SingleFlight] = None):
+        super().__init__(translator)
+        self.flight_key = flight_key
+        self.timeout = timeout
+        self.flights = flights or _translate_flights
+
+    def _key(self, text: str, target_lang: str, source_lang: str) -> Tuple:
+        return self.flight_key + (source_lang or "auto", target_lang, text_hash(text))
+
+    def _record_coalesced(self, texts: List[str]):
+        meter = self.usage_meter
+        if meter is not None and texts:
+            meter.record(getattr(self.translator, "provider_name", "Unknown"), sum(len(text) for text in texts),
+                         len(texts), cache_hit=True, operation="coalesced")
+
+    def _wait(self, call) -> Tuple[str, str, str]:
+        try:
+            return self.flights.wait(call, self.timeout)
+        except SingleFlightTimeout as e:
+            raise TransientTranslationError(f"Timed out waiting for an identical request: {str(e)}") from e
+
+    def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        if not text or not text.strip():
+            return self.translator.translate(text, target_lang, source_lang)
+        key = self._key(text, target_lang, source_lang)
+        call, leader = self.flights.claim(key)
+        if not leader:
+            result = self._wait(call)
+            self._record_coalesced([text])
+            return result
+        try:
+            result = self.translator.translate(text, target_lang, source_lang)
+        except BaseException as e:
+            self.flights.resolve(key, call, error=e)
+            raise
+        self.flights.resolve(key, call, result=result)
+        return result
+
+    async def translate_async(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        if not text or not text.strip():
+            return await self.translator.translate_async(text, target_lang, source_lang)
+        key = self._key(text, target_lang, source_lang)
+        call, leader = self.flights.claim(key)
+        if not leader:
+            # Waiting blocks, so it happens off the event loop
+            result = await asyncio.get_running_loop().run_in_executor(None, self._wait, call)
+            self._record_coalesced([text])
+            return result
+        try:
+            result = await self.translator.translate_async(text, target_lang, source_lang)
+        except BaseException as e:
+            self.flights.resolve(key, call, error=e)
+            raise
+        self.flights.resolve(key, call, result=result)
+        return result
+
+    def _claim_batch(self, texts: List[str], target_lang: str, source_lang: str) -> Tuple[Dict, List]:
+        """
+        Claim every distinct non-blank text of a batch.
+        Returns (led, joined): led maps each key this caller must translate to
+        (call, indices); joined lists (index, call) of items already in flight.
+        """
+        led: Dict[Tuple, Tuple[object, List[int]]] = {}
+        joined = []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                led.setdefault(("blank", i), (None, []))[1].append(i)
+                continue
+            key = self._key(text, target_lang, source_lang)
+            if key in led:
+                # Duplicate within this batch
+                led[key][1].append(i)
+                continue
+            call, leader = self.flights.claim(key)
+            if leader:
+                led[key] = (call, [i])
             else:
-                detected_lang = source_lang
+                joined.append((i, call))
+        return led, joined
 
-            # Perform translation
-            # The client.translate method can take a source_language argument.
-            # If it's not provided, Google Translate attempts to detect it.
-            # However, we provide detected_lang for consistency and explicit control.
-            result = self.client.translate(
-                text,
-                target_language=target_lang,
-                source_language=detected_lang if detected_lang != "auto" else None
+    def _publish(self, led: Dict, fetched: Optional[List], results: List, error: Optional[BaseException] = None):
+        """Hand the led items' results (or the batch error) to their waiters and to results"""
+        for key, result in zip(led, fetched if error is None else [error] * len(led)):
+            call, indices = led[key]
+            if call is not None:
+                if isinstance(result, BaseException):
+                    self.flights.resolve(key, call, error=result)
+                else:
+                    self.flights.resolve(key, call, result=result)
+            for i in indices:
+                results[i] = result
+
+    def _wait_joined(self, texts: List[str], joined: List, results: List):
+        for i, call in joined:
+            try:
+                results[i] = self._wait(call)
+            except TranslationError as e:
+                results[i] = e
+            except Exception as e:
+                results[i] = TranslationError(f"Translation failed: {str(e)}")
+        self._record_coalesced([texts[i] for i, _ in joined if not isinstance(results[i], TranslationError)])
+
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        source_lang: str = "auto") -> List[Union[Tuple[str, str, str], TranslationError]]:
+        """
+        Items another caller is already translating are awaited; the rest go
+        to the wrapped translator in one batch and are published to anyone
+        waiting on them.
+        """
+        results: List = [None] * len(texts)
+        led, joined = self._claim_batch(texts, target_lang, source_lang)
+        try:
+            fetched = self.translator.translate_batch([texts[led[key][1][0]] for key in led],
+                                                      target_lang, source_lang) if led else []
+        except BaseException as e:
+            self._publish(led, None, results, error=e)
+            raise
+        self._publish(led, fetched, results)
+        self._wait_joined(texts, joined, results)
+        return results
+
+    async def translate_batch_async(self, texts: List[str], target_lang: str,
+                                    source_lang: str = "auto") -> List[Union[Tuple[str, str, str], TranslationError]]:
+        results: List = [None] * len(texts)
+        led, joined = self._claim_batch(texts, target_lang, source_lang)
+        try:
+            fetched = await self.translator.translate_batch_async([texts[led[key][1][0]] for key in led],
+                                                                  target_lang, source_lang) if led else []
+        except BaseException as e:
+            self._publish(led, None, results, error=e)
+            raise
+        self._publish(led, fetched, results)
+        if joined:
+            await asyncio.get_running_loop().run_in_executor(None, self._wait_joined, texts, joined, results)
+        return results
+
+class ResilientTranslator(TranslationProvider):
+    """
+    Composite over an ordered list of providers (e.g. DeepL, then Google).
+
+    While a later provider is available (its circuit closed), transient
+    failures are retried here with jittered exponential backoff, providers
+    do not retry themselves, and a throttled provider is failed over at once.
+    The last available provider keeps its own retries (see _call_api), so a
+    single-provider chain still backs off on throttling. Each provider has a
+    process-wide circuit breaker; while a provider's circuit is open, or once
+    its retries are exhausted, requests go to the next provider, with
+    language codes mapped to that provider's codes.
+    """
+
+    def __init__(self, providers: List[Tuple[str, TranslationProvider]], max_retries: int = 2):
+        if not providers:
+            raise ValueError("ResilientTranslator needs at least one provider")
+        self.providers = providers
+        self.max_retries = max_retries
+
+    @property
+    def primary(self) -> TranslationProvider:
+        return self.providers[0][1]
+
+    # Async batches are packed to the primary's request size; a fallback re-packs to its own
+    @property
+    def request_limits(self) -> Optional[RequestLimits]:
+        return self.primary.request_limits
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.primary.max_concurrency
+
+    def get_source_languages(self) -> Dict[str, str]:
+        return self.primary.get_source_languages()
+
+    def get_target_languages(self) -> Dict[str, str]:
+        return self.primary.get_target_languages()
+
+    def get_alternatives(self, text: str, target_lang: str, num_alternatives: int = 3) -> List[str]:
+        return self.primary.get_alternatives(text, target_lang, num_alternatives)
+
+    def detect_language(self, text: str) -> Tuple[Optional[str], float]:
+        return self.primary.detect_language(text)
+
+    def _languages_for(self, index: int, target_lang: str, source_lang: str) -> Optional[Tuple[str, str]]:
+        """Map the primary provider's language codes to provider number index"""
+        if index == 0:
+            return target_lang, source_lang
+        translator = self.providers[index][1]
+        try:
+            mapped_target = match_language_code(target_lang, translator.get_target_languages())
+            mapped_source = source_lang
+            if source_lang and source_lang != "auto":
+                mapped_source = match_language_code(source_lang, translator.get_source_languages())
+        except TranslationError:
+            return None
+        if not mapped_target or not mapped_source:
+            return None
+        return mapped_target, mapped_source
+
+    def _has_fallback(self, index: int, target_lang: str, source_lang: str) -> bool:
+        """Whether a provider after number index supports the languages and has a closed circuit"""
+        return any(
+            get_circuit_breaker(name).state == CircuitBreaker.CLOSED
+            and self._languages_for(later, target_lang, source_lang) is not None
+            for later, (name, _) in enumerate(self.providers) if later > index
+        )
+
+    def _call_with_failover(self, call: Callable[[TranslationProvider, str, str], object],
+                            target_lang: str, source_lang: str) -> Tuple[object, str]:
+        last_error: Optional[TranslationError] = None
+        for index, (name, translator) in enumerate(self.providers):
+            breaker = get_circuit_breaker(name)
+            languages = self._languages_for(index, target_lang, source_lang)
+            if languages is None:
+                continue
+            # Retries happen in exactly one layer. With somewhere to fail over to, this loop
+            # retries and a throttled provider is left at once; otherwise the provider keeps
+            # its own retries, with rate limiter backoff on throttling
+            fallback = self._has_fallback(index, target_lang, source_lang)
+            for attempt in range(self.max_retries + 1 if fallback else 1):
+                if not breaker.allow():
+                    break
+                error: Optional[TranslationError] = None
+                failed = True
+                token = _inner_retries.set(not fallback)
+                try:
+                    result = call(translator, *languages)
+                    failed = False
+                except TransientTranslationError as e:
+                    error = e
+                except TranslationError as e:
+                    # The provider answered, so its circuit stays closed
+                    error, failed = e, False
+                finally:
+                    _inner_retries.reset(token)
+                    # Settled on every outcome, so a half-open trial is always released
+                    if failed:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if error is None:
+                    return result, name
+                last_error = error
+                if not isinstance(error, TransientTranslationError) or isinstance(error, RateLimitError):
+                    # Not worth retrying here (a throttled provider will not recover
+                    # within a backoff), but another provider may still succeed
+                    break
+                if attempt < self.max_retries:
+                    time.sleep(backoff_delay(attempt))
+        raise last_error or TranslationError("No translation provider is currently available.")
+
+    def translate_with_provider(self, text: str, target_lang: str,
+                                source_lang: str = "auto") -> Tuple[str, str, str, str]:
+        """
+        Like translate, but also reports which provider produced the result
+        Returns: (translated_text, detected_language, alternatives_note, provider)
+        """
+        result, name = self._call_with_failover(
+            lambda translator, target, source: translator.translate(text, target, source),
+            target_lang, source_lang
+        )
+        return result + (name,)
+
+    def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
+        return self.translate_with_provider(text, target_lang, source_lang)[:3]
+
+    def translate_batch_with_provider(self, texts: List[str], target_lang: str, source_lang: str = "auto"
+                                      ) -> Tuple[List[Union[Tuple[str, str, str], TranslationError]], List[Optional[str]]]:
+        """
+        Like translate_batch, but also reports which provider produced each result
+        Returns: (results, providers), with providers[i] None where results[i] is an error
+        """
+        try:
+            results, name = self._call_with_failover(
+                lambda translator, target, source: _raise_if_all_transient(
+                    translator.translate_batch(texts, target, source)),
+                target_lang, source_lang
             )
+        except TranslationError as e:
+            return [e] * len(texts), [None] * len(texts)
+        providers = [None if isinstance(result, TranslationError) else name for result in results]
 
-            translated_text = result['translatedText']
-            # The 'detectedSourceLanguage' might be present if source_language was not specified
-            # or if there was a mismatch. We rely on our earlier detection.
+        # Items that failed transiently inside an otherwise successful batch get another pass
+        retry = [i for i, result in enumerate(results) if isinstance(result, TransientTranslationError)]
+        if retry and len(retry) < len(texts):
+            retried = self.translate_batch_with_provider([texts[i] for i in retry], target_lang, source_lang)
+            for i, result, provider in zip(retry, *retried):
+                results[i], providers[i] = result, provider
+        return results, providers
 
-            # Alternatives are not supported by this API version directly
-            alt_text = "Alternative translations not supported by Google Translate API v2."
+    def translate_batch(self, texts: List[str], target_lang: str,
+                        source_lang: str = "auto") -> List[Union[Tuple[str, str, str], TranslationError]]:
+        return self.translate_batch_with_provider(texts, target_lang, source_lang)[0]
 
-            return translated_text, detected_lang, alt_text
+def _raise_if_all_transient(results: List[Union[Tuple[str, str, str], TranslationError]]) -> List:
+    """Treat a batch whose items all failed transiently as a failed call"""
+    if results and all(isinstance(r, TransientTranslationError) for r in results):
+        raise results[0]
+    return results
 
-        except Exception as e:
-            raise TranslationError(f"Google: Translation failed: {str(e)}")
+def create_translator_chain(configs: List[Tuple[str, Dict]], **options) -> ResilientTranslator:
+    """
+    Build a ResilientTranslator from (provider, kwargs) pairs in failover order.
+    The first provider must initialize; fallbacks that fail to initialize are skipped.
+    options (use_memory, memory, reuse, fuzzy_index, auto_accept_score) are passed to create_translator.
+    """
+    providers = []
+    for index, (provider, kwargs) in enumerate(configs):
+        try:
+            providers.append((provider, create_translator(provider, **options, **kwargs)))
+        except TranslationError:
+            if index == 0:
+                raise
+    return ResilientTranslator(providers)
+
+def compare_translations(translators: Dict[str, TranslationProvider], text: str, target_lang: str,
+                         source_lang: str = "auto") -> Iterator[Tuple[str, Union[Tuple[str, str, str], TranslationError]]]:
+    """
+    Send one text to several providers at the same time and yield
+    (provider, result) pairs as each provider answers, so the total wait is
+    the slowest provider's latency rather than the sum. target_lang and
+    source_lang are mapped to each provider's own codes; result is a
+    TranslationError when a provider fails or lacks the language.
+    """
+    def run(translator: TranslationProvider) -> Tuple[str, str, str]:
+        target = match_language_code(target_lang, translator.get_target_languages())
+        source = source_lang
+        if source_lang and source_lang != "auto":
+            source = match_language_code(source_lang, translator.get_source_languages())
+        if not target or not source:
+            raise TranslationError("Language pair not supported by this provider.")
+        return translator.translate(text, target, source)
+
+    if not translators:
+        return
+    with ThreadPoolExecutor(max_workers=len(translators)) as executor:
+        futures = {executor.submit(contextvars.copy_context().run, run, translator): name
+                   for name, translator in translators.items()}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except TranslationError as e:
+                yield futures[future], e
+            except Exception as e:
+                yield futures[future], TranslationError(f"Translation failed: {str(e)}")
 
-# class MicrosoftTranslator(TranslationProvider):
-#     def __init__(self, api_key: str, region: str, endpoint: str = "https://api.cognitive.microsofttranslator.com/"):
-#         """
-#         Initializes the Microsoft Translator.
-#         Requires API key and region. Endpoint is optional.
-#         """
-#         if not api_key:
-#             raise TranslationError("Microsoft Translator: API key is required.")
-#         if not region:
-#             raise TranslationError("Microsoft Translator: Region is required.")
-
-#         self.api_key = api_key
-#         self.region = region
-#         self.endpoint = endpoint
-#         try:
-#             credential = TranslatorCredential(self.api_key, self.region)
-#             self.client = TextTranslationClient(endpoint=self.endpoint, credential=credential)
-#             # Attempt a simple call to validate credentials somewhat (e.g., list languages)
-#             self._get_ms_languages()
-#         except ClientAuthenticationError as e:
-#             raise TranslationError(f"Microsoft Translator: Authentication failed. Check API key and region. Details: {e}")
-#         except ServiceRequestError as e:
-#             raise TranslationError(f"Microsoft Translator: Service request error during initialization. Check endpoint and network. Details: {e}")
-#         except Exception as e:
-#             raise TranslationError(f"Microsoft Translator: Failed to initialize client: {e}")
-
-#     def _get_ms_languages(self, scope="translation") -> Dict:
-#         """Helper to fetch languages from Microsoft Translator API."""
-#         # The SDK does not have a direct method to list all languages with their names easily for v3.
-#         # We use the REST API endpoint for this.
-#         url = f"{self.endpoint.rstrip('/')}/languages?api-version=3.0&scope={scope}"
-#         headers = {
-#             'Accept-Language': 'en' # Get language names in English
-#         }
-#         try:
-#             response = requests.get(url, headers=headers, timeout=10)
-#             response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-#             return response.json()
-#         except requests.exceptions.RequestException as e:
-#             raise TranslationError(f"Microsoft Translator: Error fetching languages from REST API: {e}")
-
-#     def get_source_languages(self) -> Dict[str, str]:
-#         try:
-#             languages_response = self._get_ms_languages()
-#             # The response structure is like: {"translation": {"ar": {"name": "Arabic", "nativeName": "العربية", "dir": "rtl"}}}
-#             return {code: data["name"] for code, data in languages_response.get("translation", {}).items()}
-#         except Exception as e:
-#             # Catching generic Exception as _get_ms_languages can raise TranslationError
-#             raise TranslationError(f"Microsoft Translator: Error processing source languages: {str(e)}")
-
-#     def get_target_languages(self) -> Dict[str, str]:
-#         # For Microsoft Translator, source and target languages are generally the same.
-#         return self.get_source_languages()
-
-#     def get_alternatives(self, text: str, target_lang: str, num_alternatives: int = 3) -> List[str]:
-#         # Microsoft Translator API (v3) does not directly support multiple alternative translations
-#         # in a single call in the same way DeepL does.
-#         # The 'Translate' method returns only one primary translation.
-#         return []
-
-#     def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> Tuple[str, str, str]:
-#         try:
-#             detected_language = source_lang
-
-#             if source_lang == "auto" or not source_lang:
-#                 # Perform detection if source_lang is 'auto'
-#                 detect_response = self.client.detect_language(content=[text])
-#                 if detect_response and len(detect_response) > 0 and detect_response[0].primary_language:
-#                     detected_language = detect_response[0].primary_language.language_code
-#                 else:
-#                     raise TranslationError("Microsoft Translator: Could not reliably detect source language.")
-
-#             if not detected_language or detected_language == "auto": # Should not happen if detection worked
-#                  raise TranslationError("Microsoft Translator: Invalid or undetected source language for translation.")
-
-#             # Perform translation
-#             # The SDK expects a list of strings for text_content
-#             response = self.client.translate(
-#                 content=[text],
-#                 to_language=[target_lang],
-#                 from_language=detected_language if detected_language != "auto" else None
-#             )
-
-#             if response and len(response) > 0 and response[0].translations:
-#                 translated_text = response[0].translations[0].text
-#                 # The response also contains `detected_language_info` if `from_language` was not specified.
-#                 # We use our own `detected_language` from the separate call or input.
-#                 if response[0].detected_language_info and detected_language == "auto": # Update if auto was used and SDK detected
-#                     detected_language = response[0].detected_language_info.language_code
-
-#             else:
-#                 raise TranslationError("Microsoft Translator: No translation returned from API.")
-
-#             alt_text = "Alternative translations not supported by Microsoft Translator."
-
-#             return translated_text, detected_language, alt_text
-
-#         except ClientAuthenticationError as e:
-#             raise TranslationError(f"Microsoft Translator: Authentication failed during translation. Check API key and region. Details: {e}")
-#         except ServiceRequestError as e:
-#             raise TranslationError(f"Microsoft Translator: Service error during translation. Details: {e}")
-#         except Exception as e:
-#             raise TranslationError(f"Microsoft Translator: Translation failed: {str(e)}")
-
-
-class TranslationError(Exception):
-    """Custom exception for translation errors"""
-    pass
-
-def create_translator(provider: str, **kwargs) -> TranslationProvider:
-    """Factory function to create appropriate translator instance"""
+# Long-lived translator instances shared by all sessions, keyed by (provider, credentials)
+_translator_registry: Dict[Tuple, TranslationProvider] = {}
+_registry_lock = threading.Lock()
+_registry_key_locks: Dict[Tuple, threading.Lock] = {}
+
+def _registry_key(provider: str, kwargs: Dict) -> Tuple:
+    """Registry key of a client; the arguments carry API keys, so only their fingerprints are kept"""
+    return (provider,) + tuple(sorted((name, _credential_fingerprint(repr(value))) for name, value in kwargs.items()))
+
+def _get_or_create_translator(provider: str, factory: Callable[..., TranslationProvider], kwargs: Dict) -> TranslationProvider:
+    key = _registry_key(provider, kwargs)
+    with _registry_lock:
+        translator = _translator_registry.get(key)
+        if translator is not None:
+            return translator
+        key_lock = _registry_key_locks.setdefault(key, threading.Lock())
+
+    # Build outside the registry lock so a slow provider does not block the others,
+    # while concurrent sessions asking for the same client wait for a single build
+    with key_lock:
+        with _registry_lock:
+            translator = _translator_registry.get(key)
+        if translator is None:
+            translator = factory(**kwargs)
+            with _registry_lock:
+                _translator_registry[key] = translator
+    return translator
+
+def invalidate_translator(provider: Optional[str] = None, **kwargs):
+    """
+    Drop shared translator instances so the next create_translator call builds
+    a new client, e.g. after credentials changed.
+    With no arguments every instance is dropped; with a provider, only that
+    provider's instances; with credentials as well, only that exact instance.
+    """
+    with _registry_lock:
+        if provider is None:
+            keys = list(_translator_registry)
+        elif kwargs:
+            keys = [_registry_key(provider, kwargs)]
+        else:
+            keys = [key for key in _translator_registry if key[0] == provider]
+        removed = [_translator_registry.pop(key) for key in keys if key in _translator_registry]
+    for translator in removed:
+        try:
+            translator.close()
+        except Exception:
+            pass
+
+def create_translator(provider: str, use_memory: bool = True,
+                      memory: Optional[TranslationMemory] = None, reuse: bool = True,
+                      fuzzy_index: Optional[FuzzyIndex] = None, auto_accept_score: Optional[float] = None,
+                      coalesce: bool = True, coalesce_timeout: float = 30.0,
+                      **kwargs) -> TranslationProvider:
+    """
+    Factory function to create appropriate translator instance.
+    With reuse (the default) one long-lived client per (provider, credentials)
+    is shared by every caller in the process; see invalidate_translator.
+    Unless use_memory is False, the translator is wrapped with a translation
+    memory (the process-wide default one if memory is not given); batch jobs
+    can also auto-accept fuzzy_index matches scoring at least auto_accept_score.
+    With coalesce (the default), identical requests in flight at the same time
+    from any session share one provider call; see CoalescingTranslator.
+    """
     providers = {
         "DeepL": DeepLTranslator,
         "Google Translate": GoogleTranslator, # Renaming for clarity in UI
-        # "Microsoft Translator": MicrosoftTranslator,
+        "Mock": MockTranslator, # Local mock server, for offline testing
+        "Microsoft Translator": MicrosoftTranslator,
     }
     
     if provider not in providers:
         raise ValueError(f"Unsupported provider: {provider}")
-        
-    return providers[provider](**kwargs)
\ No newline at end of file
+
+    if reuse:
+        translator = _get_or_create_translator(provider, providers[provider], kwargs)
+    else:
+        translator = providers[provider](**kwargs)
+    if use_memory:
+        translator = MemoryTranslator(provider, translator, memory, fuzzy_index, auto_accept_score)
+    if coalesce:
+        translator = CoalescingTranslator(_registry_key(provider, kwargs), translator, timeout=coalesce_timeout)
+    return translator
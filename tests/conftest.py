@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# Application modules import each other as top-level packages (db, utils) from src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
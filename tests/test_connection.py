@@ -0,0 +1,44 @@
+# tests/test_connection.py
+import sqlite3
+import threading
+from contextlib import ExitStack
+
+import pytest
+
+from db import connection
+from db.connection import close_connections, pooled_connection
+
+
+def _in_new_thread(function):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(function()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_connection_is_reused_by_later_threads(tmp_path):
+    db_path = str(tmp_path / "trans.sqlite3")
+
+    def borrow():
+        with pooled_connection(db_path) as conn:
+            conn.execute("SELECT 1")
+            return id(conn)
+
+    # Every Streamlit rerun runs in a new thread
+    assert _in_new_thread(borrow) == _in_new_thread(borrow)
+    close_connections()
+
+
+def test_connections_beyond_the_pool_size_are_closed(tmp_path):
+    db_path = str(tmp_path / "trans.sqlite3")
+    with ExitStack() as stack:
+        conns = [stack.enter_context(pooled_connection(db_path)) for _ in range(connection.POOL_SIZE + 2)]
+
+    assert len(connection._pools[db_path]) == connection.POOL_SIZE
+    closed = [conn for conn in conns if conn not in connection._pools[db_path]]
+    for conn in closed:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    close_connections()
+    assert connection._pools == {}
@@ -0,0 +1,62 @@
+# tests/test_database.py
+from db.connection import pooled_connection
+from db.database import TranslationDB
+from db.schema import SCHEMA_VERSION, check_query_plans, init_db
+
+
+def _db(tmp_path, target_texts):
+    db_path = str(tmp_path / "trans.sqlite3")
+    init_db(db_path)
+    db = TranslationDB(db_path)
+    db.save_translations_many(("p", f"source {i}", text, "en", "zh", "Mock", None)
+                              for i, text in enumerate(target_texts))
+    return db, db_path
+
+
+def test_short_terms_are_matched_within_the_filters(tmp_path):
+    db, db_path = _db(tmp_path, ["你好世界", "数据库", "世纪"])
+    db.save_translation("other", "source", "世界", "en", "zh", "Mock", None)
+
+    assert [result["id"] for result in db.search("世界", project="p")[0]] == [1]
+    assert [result["id"] for result in db.search("世", project="p")[0]] == [3, 1]
+    assert [result["id"] for result in db.search("数据库 据", project="p")[0]] == [2]
+    assert db.search("世界", project="p", target_lang="fr")[0] == []
+    results, has_more = db.search("世", project="p", page_size=1)
+    assert [result["id"] for result in results] == [3] and has_more
+    assert results[0]["target_text_highlight"] == "[世]纪"
+
+
+def test_old_bigram_index_is_dropped(tmp_path):
+    _, db_path = _db(tmp_path, [])
+
+    with pooled_connection(db_path) as conn:
+        names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE name LIKE '%bigram%'")]
+    assert names == []
+
+
+def test_schema_version_covers_every_table(tmp_path):
+    db_path = str(tmp_path / "trans.sqlite3")
+    init_db(db_path)
+
+    with pooled_connection(db_path) as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert version == SCHEMA_VERSION
+    assert {"t_translations", "t_translation_memory", "t_translation_alternatives", "t_fuzzy_bands",
+            "t_usage"} <= tables
+
+
+def test_every_query_is_index_driven(tmp_path):
+    db_path = str(tmp_path / "trans.sqlite3")
+    init_db(db_path)
+
+    assert check_query_plans(db_path) == []
+
+
+def test_full_index_scans_are_reported(tmp_path):
+    db_path = str(tmp_path / "trans.sqlite3")
+    init_db(db_path)
+    with pooled_connection(db_path) as conn:
+        conn.execute("DROP INDEX idx_translations_langs")
+
+    assert ("language pair", "SCAN t_translations USING INDEX idx_translations_created") in check_query_plans(db_path)
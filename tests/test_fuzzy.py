@@ -0,0 +1,27 @@
+# tests/test_fuzzy.py
+import sqlite3
+
+from db.schema import init_db
+from utils.fuzzy import FuzzyIndex
+
+
+def test_target_language_is_filtered_before_the_candidate_limit(tmp_path):
+    db_path = str(tmp_path / "trans.sqlite3")
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO t_translations (project, service_provider, source_text, target_text, source_lang,"
+                 " target_lang) VALUES ('p', 'DeepL', 'Save the document', '保存文档', 'EN', 'ZH-HANS')")
+    conn.executemany(
+        "INSERT INTO t_translations (project, service_provider, source_text, target_text, source_lang, target_lang)"
+        " VALUES ('p', 'DeepL', 'Save the document', ?, 'EN', 'FR')",
+        [(f"Enregistrer le document {i}",) for i in range(80)]
+    )
+    conn.commit()
+    conn.close()
+    index = FuzzyIndex(db_path)
+    index.sync()
+
+    match = index.best_match("Save the document", target_lang="zh-CN")
+
+    assert match is not None and match["target_text"] == "保存文档"
+    assert {match["target_lang"] for match in index.search("Save the document", target_lang="fr", k=100)} == {"FR"}
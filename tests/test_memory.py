@@ -0,0 +1,85 @@
+# tests/test_memory.py
+import sqlite3
+
+from db.database import TranslationDB
+from db.schema import init_db
+from utils.memory import TranslationMemory
+
+
+def _saved_translations(db_path, count):
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO t_translations (project, service_provider, source_text, target_text, source_lang, target_lang)"
+        " VALUES ('p', 'DeepL', ?, ?, 'en', 'zh')",
+        [(f"source {i}", f"target {i}") for i in range(count)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def _saved_translations_append(db_path, source_text, target_text):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO t_translations (project, service_provider, source_text, target_text, source_lang, target_lang)"
+        " VALUES ('p', 'DeepL', ?, ?, 'en', 'zh')",
+        (source_text, target_text)
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_seed_batch_sharing_one_timestamp_evicts_only_the_excess(tmp_path):
+    db_path = str(tmp_path / "memory.sqlite3")
+    # 600 saved rows seed 1200 entries (explicit language and "auto"), all with one last_used_at
+    _saved_translations(db_path, 600)
+    memory = TranslationMemory(db_path, max_entries=1000)
+    stats = memory.stats()
+    assert stats["entries"] == 900
+    assert stats["evictions"] == 300
+    memory.close()
+
+
+def test_sync_replaces_provider_output_with_saved_translation(tmp_path):
+    db_path = str(tmp_path / "memory.sqlite3")
+    _saved_translations(db_path, 0)
+    memory = TranslationMemory(db_path)
+    memory.put("DeepL", "source 0", "zh", "auto", ("provider output", "en", ""))
+
+    _saved_translations_append(db_path, "source 0", "edited target")
+    memory.sync()
+    assert memory.get("DeepL", "source 0", "zh", "auto")[0] == "edited target"
+    assert memory.get("DeepL", "source 0", "zh", "en")[0] == "edited target"
+    memory.close()
+
+
+def test_edits_to_saved_translations_replace_memory_entries(tmp_path):
+    db_path = str(tmp_path / "memory.sqlite3")
+    _saved_translations(db_path, 2)
+    memory = TranslationMemory(db_path)
+    assert memory.get("DeepL", "source 0", "zh", "en")[0] == "target 0"
+
+    db = TranslationDB(db_path)
+    db.update_translation(1, "edited target", None)
+    assert memory.get("DeepL", "source 0", "zh", "en")[0] == "edited target"
+    assert memory.get("DeepL", "source 0", "zh", "auto")[0] == "edited target"
+
+    # A cleared translation no longer answers lookups
+    db.update_translations_many([(2, None, None)])
+    assert memory.get("DeepL", "source 1", "zh", "en") is None
+    assert memory.stats()["entries"] == 2
+    memory.close()
+
+
+def test_sync_reads_saved_translations_in_batches(tmp_path):
+    db_path = str(tmp_path / "memory.sqlite3")
+    _saved_translations(db_path, 5)
+    memory = TranslationMemory(db_path, seed=False)
+
+    assert memory.sync(batch_size=2) == 5
+    assert memory.stats()["entries"] == 10
+    assert memory.get("DeepL", "source 4", "zh", "en")[0] == "target 4"
+
+    _saved_translations_append(db_path, "source 5", "target 5")
+    assert memory.sync(batch_size=2) == 1
+    memory.close()
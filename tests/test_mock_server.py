@@ -0,0 +1,98 @@
+# tests/test_mock_server.py
+import pytest
+
+from utils import languages, metering, translation
+from utils.languages import LanguageCache
+from utils.metering import UsageMeter
+from utils.mock_server import pseudo_translate, start_mock_server
+from utils.translation import (MicrosoftTranslator, RateLimitError, ResilientTranslator,
+                               TransientTranslationError, create_translator)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    """Usage and language tables in tmp_path instead of the application database, and no backoff sleeps"""
+    meter = UsageMeter(str(tmp_path / "usage.sqlite3"))
+    monkeypatch.setattr(metering, "_default_meter", meter)
+    monkeypatch.setattr(languages, "_default_cache", LanguageCache(str(tmp_path / "languages.json")))
+    monkeypatch.setattr(translation, "backoff_delay", lambda attempt: 0.0)
+    yield
+    meter.close()
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**kwargs):
+        started.append(start_mock_server(**kwargs))
+        return started[-1]
+
+    yield start
+    for server in started:
+        server.stop()
+
+
+def _mock(server):
+    translator = create_translator("Mock", server_url=server.url, use_memory=False, reuse=False, coalesce=False)
+    translator.throttle_backoff = 0.0
+    return translator
+
+
+def test_throttled_requests_are_retried(servers):
+    server = servers(error_429=0.5, seed=3)
+    translator = _mock(server)
+
+    results = [translator.translate(f"text {i}", "ZH") for i in range(10)]
+    assert [text for text, _, _ in results] == [pseudo_translate(f"text {i}", "ZH") for i in range(10)]
+    assert server.stats["status 429"] > 0
+    assert translator.api_calls["translate"] == server.stats["requests /v2/translate"] == 10 + server.stats["status 429"]
+
+
+def test_retries_give_up_with_the_error_callers_fail_over_on(servers):
+    throttled = _mock(servers(error_429=1.0))
+    with pytest.raises(RateLimitError):
+        throttled.translate("text", "ZH")
+    assert throttled.api_calls["translate"] == throttled.max_throttle_retries + 1
+
+    failing = _mock(servers(error_5xx=1.0))
+    with pytest.raises(TransientTranslationError):
+        failing.translate("text", "ZH")
+    assert failing.api_calls["translate"] == failing.max_throttle_retries + 1
+
+
+def test_throttled_provider_fails_over_at_once(servers):
+    throttled, healthy = servers(error_429=1.0), servers()
+    chain = ResilientTranslator([("throttled mock", _mock(throttled)), ("healthy mock", _mock(healthy))])
+
+    text, _, _, provider = chain.translate_with_provider("hello", "ZH")
+    assert (text, provider) == (pseudo_translate("hello", "ZH"), "healthy mock")
+    assert throttled.stats["requests /v2/translate"] == 1
+    assert healthy.stats["requests /v2/translate"] == 1
+
+
+def test_batches_are_packed_to_the_segment_limit(servers):
+    server = servers()
+    translator = _mock(server)
+    texts = [f"segment {i}" for i in range(120)]
+
+    results = translator.translate_batch(texts, "DE")
+    assert [text for text, _, _ in results] == [pseudo_translate(text, "DE") for text in texts]
+    # MockTranslator sends at most 50 segments per request
+    assert server.stats["requests /v2/translate"] == 3
+    assert server.stats["segments"] == 120
+
+
+def test_microsoft_translates_to_several_targets_in_one_request(servers):
+    server = servers()
+    translator = MicrosoftTranslator("key", "region", endpoint=server.url)
+    texts = ["hello", "world"]
+
+    results = translator.translate_to_many(texts, ["de", "fr"])
+    assert {target: [text for text, _, _ in target_results] for target, target_results in results.items()} == {
+        "de": [pseudo_translate(text, "de") for text in texts],
+        "fr": [pseudo_translate(text, "fr") for text in texts],
+    }
+    assert server.stats["requests /translate"] == 1
+    # Characters are billed once per target language
+    assert server.stats["characters"] == 2 * len("helloworld")
@@ -0,0 +1,74 @@
+# tests/test_packer.py
+import json
+
+from utils.packer import RequestLimits, pack_requests, split_oversized
+
+
+def _rejoined(pieces):
+    return "".join(prefix + body + suffix for prefix, body, suffix in pieces)
+
+
+def test_body_size_counts_escaped_non_ascii_text():
+    limits = RequestLimits(max_segments=100)
+
+    # Each CJK character is a six-byte \uXXXX escape, an emoji a surrogate pair of them
+    assert limits.segment_bytes("你好") == len(json.dumps("你好")) + 1 == 15
+    assert limits.segment_bytes("😀") == 15
+    assert limits.segment_bytes("hello") == 8
+
+
+def test_requests_are_filled_up_to_the_body_size():
+    limits = RequestLimits(max_segments=100, max_bytes=512 + 3 * 15)
+    items = [(i, "你好") for i in range(7)]
+
+    requests = list(pack_requests(items, limits))
+    assert [len(request) for request in requests] == [3, 3, 1]
+    assert [item for request in requests for item in request] == items
+
+
+def test_requests_respect_the_segment_and_character_limits():
+    items = [(i, "abcde") for i in range(7)]
+
+    assert [len(request) for request in pack_requests(items, RequestLimits(max_segments=2))] == [2, 2, 2, 1]
+    assert [len(request) for request in pack_requests(items, RequestLimits(max_segments=100, max_characters=12))] \
+        == [2, 2, 2, 1]
+
+
+def test_oversized_text_is_split_between_sentences_first():
+    text = "First sentence. Second sentence. Third one."
+    pieces = split_oversized(text, RequestLimits(max_segments=100, max_characters=20))
+
+    assert [body for _, body, _ in pieces] == ["First sentence.", "Second sentence.", "Third one."]
+    assert _rejoined(pieces) == text
+
+
+def test_sentence_over_the_limit_is_split_between_words():
+    text = "one two three four five six seven"
+    pieces = split_oversized(text, RequestLimits(max_segments=100, max_characters=20))
+
+    assert [body for _, body, _ in pieces] == ["one two three four", "five six seven"]
+    assert _rejoined(pieces) == text
+
+
+def test_word_over_the_limit_is_split_between_characters():
+    limits = RequestLimits(max_segments=100, max_characters=20)
+    assert [body for _, body, _ in split_oversized("a" * 45, limits)] == ["a" * 20, "a" * 20, "a" * 5]
+
+    # Unpunctuated CJK text is one word; 5 escaped characters fill the body
+    text = "你好世界" * 3
+    pieces = split_oversized(text, RequestLimits(max_segments=100, max_bytes=512 + 33))
+    assert [body for _, body, _ in pieces] == ["你好世界你", "好世界你好", "世界"]
+    assert _rejoined(pieces) == text
+
+
+def test_split_pieces_fit_and_rejoin_without_loss():
+    limits = RequestLimits(max_segments=100, max_bytes=512 + 40)
+    texts = [
+        "  Lead. Then a much longer sentence here.  ",
+        "你好世界。" * 5,
+        "Mixed 你好世界 text. " * 4 + "\n\nA second paragraph follows!",
+    ]
+    for text in texts:
+        pieces = split_oversized(text, limits)
+        assert _rejoined(pieces) == text
+        assert all(body and body == body.strip() and limits.fits(body) for _, body, _ in pieces)
@@ -0,0 +1,106 @@
+# tests/test_ratelimit.py
+import pytest
+
+from utils.ratelimit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _limiter(requests_per_second, characters_per_second, max_concurrency, **kwargs):
+    clock = FakeClock()
+    return RateLimiter(requests_per_second, characters_per_second, max_concurrency, clock=clock, **kwargs), clock
+
+
+def _take(limiter, characters=0):
+    """Take and give back a slot, spending its tokens"""
+    assert limiter.try_acquire(characters) == 0.0
+    limiter.release()
+
+
+def test_request_tokens_refill_at_the_request_rate():
+    limiter, clock = _limiter(2, 100, 10)
+    _take(limiter)
+    _take(limiter)
+
+    assert limiter.try_acquire() == 0.5
+    clock.advance(0.25)
+    assert limiter.try_acquire() == 0.25
+    clock.advance(0.25)
+    assert limiter.try_acquire() == 0.0
+
+
+def test_character_tokens_hold_back_large_requests():
+    limiter, clock = _limiter(10, 100, 10)
+    _take(limiter, 50)
+
+    assert limiter.try_acquire(75) == 0.25
+    clock.advance(0.25)
+    assert limiter.try_acquire(75) == 0.0
+
+
+def test_request_over_one_second_of_characters_waits_for_a_full_bucket_then_goes_into_debt():
+    limiter, clock = _limiter(10, 100, 10)
+    _take(limiter, 20)
+
+    assert limiter.try_acquire(250) == 0.2
+    clock.advance(0.2)
+    _take(limiter, 250)
+    assert limiter.try_acquire(0) == 1.5
+    clock.advance(1.5)
+    assert limiter.try_acquire(0) == 0.0
+
+
+def test_concurrency_slots_are_freed_by_release():
+    limiter, _ = _limiter(100, 1000, 2)
+    with limiter.slot():
+        assert limiter.try_acquire() == 0.0
+        assert limiter.try_acquire() > 0
+        assert limiter.stats()["in_flight"] == 2
+        limiter.release()
+        assert limiter.try_acquire() == 0.0
+        limiter.release()
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_throttling_halves_the_limits_down_to_their_floors():
+    limiter, _ = _limiter(16, 1600, 8)
+    limiter.on_throttle()
+    stats = limiter.stats()
+    assert (stats["concurrency_limit"], stats["requests_per_second"], stats["characters_per_second"]) == (4, 8, 800)
+
+    for _ in range(5):
+        limiter.on_throttle()
+    stats = limiter.stats()
+    assert (stats["concurrency_limit"], stats["requests_per_second"], stats["characters_per_second"]) == (1, 1, 100)
+    assert stats["throttle_events"] == 6
+
+
+def test_successes_widen_the_limits_one_window_at_a_time_up_to_the_maximums():
+    limiter, _ = _limiter(16, 1600, 8)
+    for _ in range(6):
+        limiter.on_throttle()
+
+    # One success is a full window at a concurrency limit of 1
+    limiter.on_success()
+    stats = limiter.stats()
+    assert stats["concurrency_limit"] == 2
+    assert stats["requests_per_second"] == pytest.approx(2.6)
+    assert stats["characters_per_second"] == pytest.approx(260)
+    limiter.on_success()
+    assert limiter.stats()["concurrency_limit"] == 2
+    limiter.on_success()
+    assert limiter.stats()["concurrency_limit"] == 3
+
+    for _ in range(100):
+        limiter.on_success()
+    stats = limiter.stats()
+    assert (stats["concurrency_limit"], stats["requests_per_second"], stats["characters_per_second"]) == (8, 16, 1600)
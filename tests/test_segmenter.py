@@ -0,0 +1,17 @@
+# tests/test_segmenter.py
+from utils.errors import RateLimitError
+from utils.segmenter import iter_translated_batches
+
+
+class _ThrottledTranslator:
+    def translate_batch(self, texts, target_lang, source_lang="auto"):
+        raise RateLimitError("throttled")
+
+
+def test_provider_errors_reach_the_caller_unwrapped():
+    batches = list(iter_translated_batches(_ThrottledTranslator(), ["one", "two"], "ZH"))
+
+    results = [result for batch, _ in batches for result in batch]
+    assert len(results) == 2
+    assert all(isinstance(result, RateLimitError) for result in results)
+    assert [providers for _, providers in batches] == [[None], [None]]